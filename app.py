@@ -7,15 +7,106 @@ Berechnet die Heizlast eines Gebaeudes aus:
 - Wohnflaeche, Baujahr, Personenzahl
 """
 
-from datetime import date, datetime
+import hashlib
+import json
+import uuid
+from datetime import date, datetime, timedelta
 
 from flask import Flask, render_template, request, jsonify
-from utils.geo import geo_mapper
-from utils.dwd import get_temperature_data
-from utils.heizlast import berechne_heizlast, get_heizlast_schaetzung_baujahr
+from utils.geo import LAENDER, geo_mapper
+from utils.cache import cache, saison_store
+from utils.dwd import get_hourly_temperatures, get_temperature_data
+from utils.heizlast import (
+    berechne_heizlast,
+    get_heizlast_schaetzung_baujahr,
+    get_norm_temperature,
+    norm_temperatur_warnung,
+)
+from utils.profiling import profiled
+from utils.schema import BERECHNEN, SAISON, SAISON_NEU, WAERMEPUMPE, ZUSTAND
+from utils.saison import auswerten, neuer_zustand, zustand_aktualisieren
+from utils.waermepumpe import simuliere_waermepumpen, stundenprofil
 
 app = Flask(__name__)
 
+# Cache-TTL fuer fertige Berechnungsergebnisse [s]
+ERGEBNIS_CACHE_TTL = 3600
+
+# Aufbewahrung einer Saison nach der letzten Ablesung [s]
+SAISON_TTL = 400 * 86400
+
+
+def _encode_series(daily_temps, precision=None):
+    """
+    Tagesreihe kompakt kodieren: Startdatum + Werte-Array (ein Wert pro Tag,
+    null fuer fehlende Tage) statt eines Dicts mit Datums-Strings als Keys.
+    """
+    if not daily_temps:
+        return {"start": None, "values": []}
+    days = sorted(daily_temps)
+    start = date.fromisoformat(days[0])
+    end = date.fromisoformat(days[-1])
+    if (end - start).days + 1 == len(days):
+        # Lueckenlos (der Normalfall): keine Datumsrechnung pro Tag noetig
+        values = [daily_temps[day] for day in days]
+    else:
+        values = [
+            daily_temps.get((start + timedelta(days=i)).isoformat())
+            for i in range((end - start).days + 1)
+        ]
+    if precision is not None:
+        values = [None if temp is None else round(temp, precision) for temp in values]
+    return {"start": start.isoformat(), "values": values}
+
+
+def _encode_varianten(varianten):
+    """Sensitivitaets-Varianten spaltenweise kodieren (ein Array pro Kennzahl)."""
+    if not varianten:
+        return {}
+    return {key: [v[key] for v in varianten] for key in varianten[0]}
+
+
+def _shape_response(result, fields=None, compact=False, precision=None):
+    """
+    Antwort von /api/berechnen auf die angeforderten Abschnitte reduzieren.
+
+    fields:    Menge der Top-Level-Keys, die zurueckgegeben werden (None = alle,
+               erlaubte Namen: utils.schema.ERGEBNIS_ABSCHNITTE)
+    compact:   daily_temps als Startdatum + Werte-Array und
+               sensitivitaet.varianten spaltenweise kodieren
+    precision: Nachkommastellen fuer die Tagesreihe (None = unveraendert)
+    """
+    if fields is not None:
+        result = {k: v for k, v in result.items() if k in fields}
+    else:
+        result = dict(result)
+    if compact and "sensitivitaet" in result:
+        result["sensitivitaet"] = dict(
+            result["sensitivitaet"],
+            varianten=_encode_varianten(result["sensitivitaet"].get("varianten")),
+        )
+    if "daily_temps" in result:
+        if compact:
+            result["daily_temps"] = _encode_series(result["daily_temps"], precision)
+        elif precision is not None:
+            result["daily_temps"] = {
+                day: round(temp, precision) for day, temp in result["daily_temps"].items()
+            }
+    return result
+
+
+def _keine_daten():
+    """400 im Fehlerformat der Schemas fuer leere, kaputte oder Nicht-JSON-Bodies."""
+    meldung = "Keine Daten empfangen. Erwartet wird ein JSON-Objekt (Content-Type: application/json)."
+    return jsonify({"error": meldung, "fehler": [{"feld": None, "code": "json", "meldung": meldung}]}), 400
+
+
+def _ohne_datensatz(land):
+    """501-Antwort, wenn fuer das Land PLZ- oder Stationsdaten fehlen, sonst None."""
+    if geo_mapper.datensatz_vorhanden(land):
+        return None
+    return jsonify({"error": "Fuer {} ist kein Datensatz installiert.".format(land)}), 501
+
 
 @app.route("/")
 def index():
@@ -26,10 +117,17 @@ def index():
 def api_station():
     """Naechste Wetterstation fuer eine PLZ finden."""
     plz = request.args.get("plz", "").strip()
-    if not plz or len(plz) != 5:
-        return jsonify({"error": "Bitte eine gueltige 5-stellige PLZ eingeben."}), 400
+    land = request.args.get("land", "DE").strip().upper()
+    if land not in LAENDER:
+        return jsonify({"error": "Unbekanntes Land: {}".format(land)}), 400
+    fehlt = _ohne_datensatz(land)
+    if fehlt:
+        return fehlt
+    if not plz.isdigit() or len(plz) != LAENDER[land]["plz_stellen"]:
+        return jsonify({"error": "Bitte eine gueltige {}-stellige PLZ eingeben.".format(
+            LAENDER[land]["plz_stellen"])}), 400
 
-    station = geo_mapper.find_nearest_station(plz)
+    station = geo_mapper.find_nearest_station(plz, land)
     if not station:
         return jsonify({"error": "Keine Wetterstation fuer PLZ {} gefunden.".format(plz)}), 404
 
@@ -37,37 +135,37 @@ def api_station():
 
 
 @app.route("/api/berechnen", methods=["POST"])
+@profiled
 def api_berechnen():
     """Heizlast berechnen."""
-    data = request.get_json()
+    data = request.get_json(silent=True)
     if not data:
-        return jsonify({"error": "Keine Daten empfangen."}), 400
+        return _keine_daten()
+
+    # Formatoptionen duerfen auch als Query-Parameter kommen
+    if isinstance(data, dict):
+        for key in ("fields", "compact", "precision"):
+            if key not in data and key in request.args:
+                data[key] = request.args[key]
 
     # Eingaben validieren
-    required = ["plz", "datum_von", "datum_bis", "gasverbrauch", "wohnflaeche", "baujahr"]
-    for field in required:
-        if field not in data or data[field] in (None, ""):
-            return jsonify({"error": "Feld '{}' fehlt.".format(field)}), 400
+    werte, fehler = BERECHNEN.validieren(data)
+    if fehler:
+        return jsonify(fehler), 400
 
-    plz = str(data["plz"]).strip().zfill(5)
+    land = werte["land"]
+    fehlt = _ohne_datensatz(land)
+    if fehlt:
+        return fehlt
+    plz = geo_mapper.normalize_plz(werte["plz"], land)
     datum_von = data["datum_von"]
     datum_bis = data["datum_bis"]
-
-    # Datetime mit Uhrzeit parsen (Format: "YYYY-MM-DDTHH:MM" oder "YYYY-MM-DD")
-    try:
-        if "T" in datum_von:
-            dt_von = datetime.strptime(datum_von, "%Y-%m-%dT%H:%M")
-        else:
-            dt_von = datetime.strptime(datum_von, "%Y-%m-%d")
-        if "T" in datum_bis:
-            dt_bis = datetime.strptime(datum_bis, "%Y-%m-%dT%H:%M")
-        else:
-            dt_bis = datetime.strptime(datum_bis, "%Y-%m-%d")
-    except ValueError:
-        return jsonify({"error": "Ungueltiges Datumsformat."}), 400
+    dt_von = werte["datum_von"]
+    dt_bis = werte["datum_bis"]
 
     now = datetime.now()
-    if dt_bis > now:
+    bis_gekappt = dt_bis > now
+    if bis_gekappt:
         dt_bis = now
     if dt_von > dt_bis:
         return jsonify({"error": "Das Startdatum liegt nach dem Enddatum."}), 400
@@ -80,23 +178,23 @@ def api_berechnen():
         return jsonify({"error": "Der Messzeitraum muss groesser als 0 sein."}), 400
 
     # Datum-only Strings fuer die DWD-API (braucht nur Tage)
-    datum_von_api = dt_von.strftime("%Y-%m-%d")
-    datum_bis_api = dt_bis.strftime("%Y-%m-%d")
-
-    try:
-        gasverbrauch = float(data["gasverbrauch"])
-        wohnflaeche = float(data["wohnflaeche"])
-        baujahr = int(data["baujahr"])
-    except (ValueError, TypeError):
-        return jsonify({"error": "Ungueltige Zahlenwerte."}), 400
-
-    # Optionale erweiterte Parameter
-    personen = int(data.get("personen", 0) or 0)
-    t_heizgrenze = float(data.get("heizgrenze", 15.0) or 15.0)
-    brennwert = float(data.get("brennwert", 11.2) or 11.2)
-    zustandszahl = float(data.get("zustandszahl", 0.95) or 0.95)
-    eta = float(data.get("eta", 1.0) or 1.0)
-    einheit = data.get("einheit", "kwh")
+    datum_von_api = dt_von.date().isoformat()
+    datum_bis_api = dt_bis.date().isoformat()
+
+    gasverbrauch = werte["gasverbrauch"]
+    wohnflaeche = werte["wohnflaeche"]
+    baujahr = werte["baujahr"]
+    personen = werte["personen"]
+    t_heizgrenze = werte["heizgrenze"]
+    brennwert = werte["brennwert"]
+    zustandszahl = werte["zustandszahl"]
+    eta = werte["eta"]
+    einheit = werte["einheit"]
+
+    # Antwortformat: nur angeforderte Abschnitte, kompakte Tagesreihe
+    fields = werte["fields"] or None
+    compact = werte["compact"]
+    precision = werte["precision"]
 
     # Gas-Umrechnung
     if einheit == "m3":
@@ -104,8 +202,21 @@ def api_berechnen():
     else:
         gasverbrauch_kwh = gasverbrauch
 
+    # Fertiges Ergebnis aus dem (ggf. geteilten) Cache; nicht bei offenem
+    # Zeitraum, da sich die Messdauer dann mit jeder Anfrage aendert
+    cache_key = None
+    if not bis_gekappt:
+        schluessel = json.dumps([
+            land, plz, datum_von, datum_bis, gasverbrauch, einheit, wohnflaeche, baujahr,
+            personen, t_heizgrenze, brennwert, zustandszahl, eta,
+        ])
+        cache_key = "ergebnis:" + hashlib.sha1(schluessel.encode("utf-8")).hexdigest()
+        cached = cache.get(cache_key)
+        if cached is not None:
+            return jsonify(_shape_response(cached, fields, compact, precision))
+
     # Naechste Wetterstation finden
-    station = geo_mapper.find_nearest_station(plz)
+    station = geo_mapper.find_nearest_station(plz, land)
     if not station:
         return jsonify({"error": "Keine Wetterstation fuer PLZ {} gefunden.".format(plz)}), 404
 
@@ -114,16 +225,19 @@ def api_berechnen():
         station["lat"], station["lon"], datum_von_api, datum_bis_api
     )
     if "error" in temp_data:
+        if temp_data.get("gedrosselt"):
+            return jsonify(temp_data), 503, {"Retry-After": "30"}
         return jsonify(temp_data), 500
 
     daily_temps = temp_data.get("daily_means", {})
 
     # Temperaturdaten auf tatsaechlichen Messzeitraum begrenzen
     # Die Bright Sky API liefert manchmal einen zusaetzlichen Tag
-    daily_temps = {
-        day: temp for day, temp in daily_temps.items()
-        if datum_von_api <= day <= datum_bis_api
-    }
+    if daily_temps and (min(daily_temps) < datum_von_api or max(daily_temps) > datum_bis_api):
+        daily_temps = {
+            day: temp for day, temp in daily_temps.items()
+            if datum_von_api <= day <= datum_bis_api
+        }
 
     # Heizlast berechnen
     result = berechne_heizlast(
@@ -136,6 +250,7 @@ def api_berechnen():
         t_heizgrenze=t_heizgrenze,
         eta=eta,
         messdauer_tage=messdauer_tage,
+        land=land,
     )
 
     if "error" in result:
@@ -151,6 +266,7 @@ def api_berechnen():
     }
     result["eingaben"] = {
         "plz": plz,
+        "land": land,
         "datum_von": datum_von,
         "datum_bis": datum_bis,
         "messdauer_tage": round(messdauer_tage, 2),
@@ -167,6 +283,206 @@ def api_berechnen():
     }
     result["daily_temps"] = daily_temps
 
+    if temp_data.get("veraltet"):
+        result["warnungen"].append(
+            "Der Wetterdienst ist gerade ausgelastet. Es wurden zwischengespeicherte "
+            "Temperaturdaten verwendet, die letzten Tage koennen fehlen."
+        )
+    elif cache_key is not None:
+        cache.set(cache_key, result, ERGEBNIS_CACHE_TTL)
+
+    return jsonify(_shape_response(result, fields, compact, precision))
+
+
+@app.route("/api/saison", methods=["POST"])
+def api_saison():
+    """
+    Laufende Saison: neue Zaehlerablesung einrechnen.
+
+    Ohne saison_id wird eine neue Saison mit der ersten Ablesung angelegt.
+    Der Zustand wird serverseitig im Saison-Speicher (utils.cache.saison_store,
+    getrennt vom Cache und ohne LRU-Verdraengung) bis SAISON_TTL nach der
+    letzten Ablesung gespeichert (fuer Dauerhaftigkeit HEIZLAST_SAISON_STORE
+    oder HEIZLAST_CACHE auf sqlite:/// oder redis:// setzen) und
+    zusaetzlich zurueckgegeben; er kann alternativ als "zustand" (ohne
+    saison_id) mitgeschickt werden und wird dann nicht gespeichert.
+
+    Zwei gleichzeitige Ablesungen fuer dieselbe saison_id werden nicht
+    gegeneinander abgesichert: beide rechnen auf demselben alten Zustand, die
+    spaeter gespeicherte gewinnt und die andere Ablesung geht verloren.
+    Ablesungen einer Saison daher nacheinander senden.
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return _keine_daten()
+
+    werte, fehler = SAISON.validieren(data)
+    if fehler:
+        return jsonify(fehler), 400
+
+    dt = werte["datum"]
+    zaehlerstand = werte["zaehlerstand"]
+    if dt > datetime.now():
+        return jsonify({"error": "Das Ablesedatum liegt in der Zukunft."}), 400
+    datum = dt.strftime("%Y-%m-%dT%H:%M")
+
+    saison_id = werte["saison_id"]
+    zustand = data.get("zustand")
+    if zustand is not None:
+        if saison_id:
+            return jsonify({"error": "Bitte entweder saison_id oder zustand angeben."}), 400
+        zustand, fehler = ZUSTAND.validieren(zustand)
+        if fehler:
+            fehler["error"] = "Ungueltiger Zustand: " + fehler["error"]
+            return jsonify(fehler), 400
+        zustand["plz"] = geo_mapper.normalize_plz(zustand["plz"], zustand["land"])
+        for key in ("datum_start", "letzte_ablesung"):
+            zustand[key] = zustand[key].strftime("%Y-%m-%dT%H:%M")
+    elif saison_id:
+        zustand = saison_store.get("saison:" + saison_id)
+        if zustand is None:
+            return jsonify({"error": "Saison {} nicht gefunden.".format(saison_id)}), 404
+
+    if zustand is None:
+        # Erste Ablesung: Saison anlegen
+        neu, fehler = SAISON_NEU.validieren(data)
+        if fehler:
+            return jsonify(fehler), 400
+        fehlt = _ohne_datensatz(neu["land"])
+        if fehlt:
+            return fehlt
+        if neu["einheit"] == "m3":
+            kwh_faktor = neu["brennwert"] * neu["zustandszahl"]
+        else:
+            kwh_faktor = 1.0
+
+        saison_id = uuid.uuid4().hex
+        zustand = neuer_zustand(
+            plz=geo_mapper.normalize_plz(neu["plz"], neu["land"]),
+            land=neu["land"],
+            datum=datum,
+            zaehlerstand=zaehlerstand,
+            wohnflaeche=neu["wohnflaeche"],
+            personen=neu["personen"],
+            t_heizgrenze=neu["heizgrenze"],
+            eta=neu["eta"],
+            kwh_faktor=kwh_faktor,
+        )
+    else:
+        dt_letzte = datetime.fromisoformat(zustand["letzte_ablesung"])
+        messdauer_tage = (dt - dt_letzte).total_seconds() / 86400.0
+        if messdauer_tage <= 0:
+            return jsonify({"error": "Die Ablesung liegt vor der letzten Ablesung."}), 400
+
+        fehlt = _ohne_datensatz(zustand.get("land", "DE"))
+        if fehlt:
+            return fehlt
+        station = geo_mapper.find_nearest_station(zustand["plz"], zustand.get("land", "DE"))
+        if not station:
+            return jsonify({"error": "Keine Wetterstation fuer PLZ {} gefunden.".format(zustand["plz"])}), 404
+
+        # Nur die neuen Tage [letzte Ablesung, neue Ablesung) abrufen
+        tag_von = dt_letzte.strftime("%Y-%m-%d")
+        tag_bis = (dt - timedelta(days=1)).strftime("%Y-%m-%d")
+        if tag_bis < tag_von:
+            return jsonify({"error": "Seit der letzten Ablesung ist kein voller Tag vergangen."}), 400
+        temp_data = get_temperature_data(station["lat"], station["lon"], tag_von, tag_bis)
+        if "error" in temp_data:
+            if temp_data.get("gedrosselt"):
+                return jsonify(temp_data), 503, {"Retry-After": "30"}
+            return jsonify(temp_data), 500
+        daily_temps = {
+            day: temp for day, temp in temp_data["daily_means"].items()
+            if tag_von <= day <= tag_bis
+        }
+
+        try:
+            zustand = zustand_aktualisieren(zustand, datum, zaehlerstand, daily_temps, messdauer_tage)
+        except ValueError as e:
+            return jsonify({"error": str(e)}), 400
+
+    if saison_id:
+        saison_store.set("saison:" + saison_id, zustand, SAISON_TTL)
+
+    return jsonify({
+        "saison_id": saison_id,
+        "ergebnis": auswerten(zustand),
+        "zustand": zustand,
+    })
+
+
+@app.route("/api/waermepumpe", methods=["POST"])
+def api_waermepumpe():
+    """
+    Waermepumpen-Auslegung: Stundensimulation mit dem ermittelten b (und a)
+    ueber ein Referenzjahr der naechsten Station.
+    """
+    data = request.get_json(silent=True)
+    if not data:
+        return _keine_daten()
+
+    werte, fehler = WAERMEPUMPE.validieren(data)
+    if fehler:
+        return jsonify(fehler), 400
+
+    land = werte["land"]
+    fehlt = _ohne_datensatz(land)
+    if fehlt:
+        return fehlt
+    plz = geo_mapper.normalize_plz(werte["plz"], land)
+    b = werte["waermeverlustkennwert_b"]
+    a = werte["grundlast_kwh_tag"]
+    t_heizgrenze = werte["heizgrenze"]
+    referenzjahr = werte["referenzjahr"] or date.today().year - 1
+    geraete = werte["geraete"]
+    if referenzjahr >= date.today().year:
+        return jsonify({"error": "Das Referenzjahr muss abgeschlossen sein."}), 400
+
+    station = geo_mapper.find_nearest_station(plz, land)
+    if not station:
+        return jsonify({"error": "Keine Wetterstation fuer PLZ {} gefunden.".format(plz)}), 404
+
+    temp_data = get_hourly_temperatures(
+        station["lat"], station["lon"],
+        "{}-01-01".format(referenzjahr), "{}-12-31".format(referenzjahr),
+    )
+    if "error" in temp_data:
+        if temp_data.get("gedrosselt"):
+            return jsonify(temp_data), 503, {"Retry-After": "30"}
+        return jsonify(temp_data), 500
+
+    result = simuliere_waermepumpen(
+        stundenprofil(temp_data["hourly"]),
+        b=b,
+        t_norm=get_norm_temperature(plz, land),
+        a=a,
+        t_heizgrenze=t_heizgrenze,
+        geraete=geraete,
+    )
+    if "error" in result:
+        return jsonify(result), 400
+
+    # Fehlende Tage verkuerzen Jahresbedarf, Deckungsgrade und Vollbenutzungsstunden
+    stunden_jahr = (date(referenzjahr + 1, 1, 1) - date(referenzjahr, 1, 1)).days * 24
+    result["stunden_erwartet"] = stunden_jahr
+    result["warnungen"] = []
+    norm_warnung = norm_temperatur_warnung(plz, land)
+    if norm_warnung:
+        result["warnungen"].append(norm_warnung)
+    if result["stunden"] < stunden_jahr:
+        result["warnungen"].append(
+            "Fuer {} Tage des Referenzjahres fehlen Temperaturdaten. Jahresbedarf, "
+            "Deckungsgrade und Vollbenutzungsstunden beziehen sich nur auf {} von {} "
+            "Stunden.".format((stunden_jahr - result["stunden"]) // 24, result["stunden"], stunden_jahr)
+        )
+    if temp_data.get("veraltet"):
+        result["warnungen"].append(
+            "Der Wetterdienst ist gerade ausgelastet. Es wurden zwischengespeicherte "
+            "Temperaturdaten verwendet."
+        )
+
+    result["station"] = station
+    result["referenzjahr"] = referenzjahr
     return jsonify(result)
 
 
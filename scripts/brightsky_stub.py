@@ -0,0 +1,110 @@
+"""
+Local Bright Sky stub that replays recorded responses.
+
+Record once against the real API (every successful upstream call is stored):
+    BRIGHTSKY_RECORD_DIR=fixtures/brightsky python scripts/loadgen.py --in-process
+
+Replay offline:
+    python scripts/brightsky_stub.py fixtures/brightsky --port 8765 \\
+        --latency-ms 80 --jitter-ms 40 --error-rate 0.02 --error-status 429
+    BRIGHTSKY_URL=http://127.0.0.1:8765/weather gunicorn app:app
+
+Latency and injected errors are drawn from a seeded RNG, so a run with the
+same seed and request order is reproducible. Unrecorded requests get 404.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from utils import replay  # noqa: E402
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        server = self.server
+        url = urlparse(self.path)
+        params = dict(parse_qsl(url.query))
+
+        with server.lock:
+            server.requests += 1
+            delay = max(0.0, server.latency + server.rng.uniform(-server.jitter, server.jitter))
+            fail = server.rng.random() < server.error_rate
+        time.sleep(delay)
+
+        if fail:
+            self._send(server.error_status, {"error": "injected"})
+            return
+
+        data = replay.load(server.store, url.path, params)
+        if data is None:
+            with server.lock:
+                server.misses += 1
+            self._send(404, {"error": "not recorded", "path": url.path, "params": params})
+            return
+        self._send(200, data)
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if status in (429, 503):
+            self.send_header("Retry-After", "1")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(store, host="127.0.0.1", port=0, latency_ms=0.0, jitter_ms=0.0,
+                error_rate=0.0, error_status=503, seed=0):
+    """Create (but do not start) a replay server; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), ReplayHandler)
+    server.store = store
+    server.latency = latency_ms / 1000.0
+    server.jitter = jitter_ms / 1000.0
+    server.error_rate = error_rate
+    server.error_status = error_status
+    server.rng = random.Random(seed)
+    server.lock = threading.Lock()
+    server.requests = 0
+    server.misses = 0
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bright Sky replay stub")
+    parser.add_argument("store", help="fixture directory (BRIGHTSKY_RECORD_DIR)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--error-status", type=int, default=503)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    server = make_server(
+        args.store, args.host, args.port, args.latency_ms, args.jitter_ms,
+        args.error_rate, args.error_status, args.seed,
+    )
+    print(f"Replaying {args.store} on http://{args.host}:{server.server_port}/weather")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{server.requests} requests, {server.misses} not recorded")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Build the PLZ-level overrides of norm outdoor temperatures (DIN/TS 12831-1).
+
+Reads the official per-PLZ list (DIN/TS 12831-1 Beiblatt, "PLZ;Temperatur"
+CSV) and keeps only PLZ whose value differs from the two-digit prefix table
+in utils/heizlast.py (or whose prefix is not in that table). Everything else
+is answered by the prefix table, which stays the single source for regional
+values. Without the official list the output is empty.
+
+Usage:
+    python scripts/build_norm_temperatures.py --source norm_temperaturen.csv
+
+Writes data/plz_norm_temperatures.json ({"83458": -18, ...}).
+"""
+
+import argparse
+import csv
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(ROOT, "data")
+OUTPUT = os.path.join(DATA_DIR, "plz_norm_temperatures.json")
+
+sys.path.insert(0, ROOT)
+from utils.heizlast import NORM_AUSSENTEMPERATUR  # noqa: E402
+
+
+def load_source(path):
+    """Read 'PLZ;Temperatur' rows (header optional, ',' or ';' separated)."""
+    table = {}
+    with open(path, "r", encoding="utf-8-sig") as f:
+        sample = f.read(4096)
+        f.seek(0)
+        dialect = csv.Sniffer().sniff(sample, delimiters=";,")
+        for row in csv.reader(f, dialect):
+            if len(row) < 2 or not row[0].strip().isdigit():
+                continue
+            table[row[0].strip().zfill(5)] = float(row[1].replace(",", "."))
+    return table
+
+
+def build(source):
+    """PLZ (from data/plz_coordinates.json) whose source value differs from the prefix table."""
+    with open(os.path.join(DATA_DIR, "plz_coordinates.json"), "r") as f:
+        plz_list = sorted(json.load(f))
+
+    table = {}
+    for plz in plz_list:
+        if plz not in source:
+            continue
+        value = source[plz]
+        if NORM_AUSSENTEMPERATUR.get(plz[:2]) == value:
+            continue
+        table[plz] = int(value) if value == int(value) else value
+    return table
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build plz_norm_temperatures.json")
+    parser.add_argument("--source", required=True, help="official per-PLZ list (CSV)")
+    parser.add_argument("--output", default=OUTPUT)
+    args = parser.parse_args()
+
+    source = load_source(args.source)
+    table = build(source)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(table, f, separators=(",", ":"))
+
+    print(f"Wrote {len(table)} overrides to {args.output} ({len(source)} PLZ in source list)")
+
+
+if __name__ == "__main__":
+    main()
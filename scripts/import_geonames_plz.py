@@ -0,0 +1,78 @@
+"""
+Import postal-code coordinates for another country from a GeoNames dump.
+
+GeoNames publishes one tab-separated file per country
+(https://download.geonames.org/export/zip/, e.g. AT.zip -> AT.txt).
+Several places can share one postal code; their coordinates are averaged.
+
+Usage:
+    python scripts/import_geonames_plz.py AT path/to/AT.txt
+
+Writes data/<land>/plz_coordinates.json ({"1010": [48.2077, 16.3705], ...}).
+Weather stations for the country go into data/<land>/stations.json in the
+same format as data/dwd_stations.json.
+"""
+
+import json
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from utils.geo import DATA_DIR, LAENDER  # noqa: E402
+
+# GeoNames postal code columns
+COL_POSTAL_CODE = 1
+COL_LAT = 9
+COL_LON = 10
+
+
+def read_geonames(path, digits):
+    """Average coordinates per postal code."""
+    sums = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            cols = line.rstrip("\n").split("\t")
+            if len(cols) <= COL_LON:
+                continue
+            plz = cols[COL_POSTAL_CODE].strip()
+            if not plz.isdigit() or len(plz) != digits:
+                continue
+            try:
+                lat = float(cols[COL_LAT])
+                lon = float(cols[COL_LON])
+            except ValueError:
+                continue
+            s = sums.setdefault(plz, [0.0, 0.0, 0])
+            s[0] += lat
+            s[1] += lon
+            s[2] += 1
+    return {
+        plz: [round(s[0] / s[2], 4), round(s[1] / s[2], 4)]
+        for plz, s in sorted(sums.items())
+    }
+
+
+def main():
+    if len(sys.argv) != 3:
+        print(__doc__)
+        sys.exit(1)
+
+    land, path = sys.argv[1].upper(), sys.argv[2]
+    if land not in LAENDER:
+        print(f"Unknown country {land}; add it to LAENDER in utils/geo.py first.")
+        sys.exit(1)
+
+    config = LAENDER[land]
+    coords = read_geonames(path, config["plz_stellen"])
+
+    output = os.path.join(DATA_DIR, config["plz_datei"])
+    os.makedirs(os.path.dirname(output), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(coords, f, separators=(",", ":"))
+
+    print(f"Wrote {len(coords)} postal codes to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+"""
+Load generator for /api/berechnen.
+
+Builds a seeded, reproducible request mix (PLZ pool drawn from
+data/plz_coordinates.json, heating-season periods of typical lengths) and
+reports latency percentiles and throughput.
+
+Usage:
+    python scripts/loadgen.py --url http://127.0.0.1:5000 [--requests 500]
+                              [--concurrency 16] [--seed 1] [--plz-pool 50]
+                              [--reference-date 2025-07-01]
+    python scripts/loadgen.py --in-process ...   (Flask test client, no server)
+
+Together with BRIGHTSKY_RECORD_DIR (record) and scripts/brightsky_stub.py
+(replay) this runs fully offline and deterministically. The request mix
+depends only on --seed, --plz-pool and --reference-date (not on today's
+date), so keep the reference date fixed for a fixture store; the default
+covers the 2021/22 to 2023/24 heating seasons.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Typical measurement periods [days] and how often they occur
+DAUERN = [7, 14, 30, 60, 90, 180]
+GEWICHTE = [3, 3, 4, 3, 2, 1]
+# Fixed default so recorded fixtures keep matching after New Year
+REFERENCE_DATE = date(2025, 7, 1)
+
+BAUJAHRE = [1910, 1935, 1955, 1965, 1975, 1982, 1990, 1998, 2005, 2012, 2020]
+
+
+def make_payloads(n, seed=1, plz_pool=50, reference_date=REFERENCE_DATE):
+    """Reproducible request mix over the heating seasons before reference_date."""
+    rng = random.Random(seed)
+    with open(os.path.join(ROOT, "data", "plz_coordinates.json"), "r") as f:
+        plz_all = sorted(json.load(f))
+    pool = rng.sample(plz_all, min(plz_pool, len(plz_all)))
+
+    # Three complete heating seasons (October to April) before the reference date
+    seasons = [reference_date.year - k for k in (2, 3, 4)]
+
+    payloads = []
+    for _ in range(n):
+        season_start = date(rng.choice(seasons), 10, 1)
+        start = season_start + timedelta(days=rng.randint(0, 165))
+        dauer = rng.choices(DAUERN, GEWICHTE)[0]
+        end = min(start + timedelta(days=dauer), reference_date - timedelta(days=2))
+        payloads.append({
+            "plz": rng.choice(pool),
+            "datum_von": start.isoformat() + "T08:00",
+            "datum_bis": end.isoformat() + "T08:00",
+            "gasverbrauch": round((end - start).days * rng.uniform(20, 90)),
+            "wohnflaeche": rng.randrange(70, 260, 5),
+            "baujahr": rng.choice(BAUJAHRE),
+            "personen": rng.choice([0, 1, 2, 2, 3, 4]),
+            "fields": "heizlast_kw,waermeverlustkennwert_b",
+        })
+    return payloads
+
+
+def percentile(sorted_values, pct):
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    k = max(0, min(len(sorted_values) - 1, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[k]
+
+
+def http_sender(url):
+    import requests
+
+    local = threading.local()
+
+    def send(payload):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        return session.post(url.rstrip("/") + "/api/berechnen", json=payload, timeout=120).status_code
+
+    return send
+
+
+def in_process_sender():
+    sys.path.insert(0, ROOT)
+    from app import app
+
+    local = threading.local()
+
+    def send(payload):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = app.test_client()
+        return client.post("/api/berechnen", json=payload).status_code
+
+    return send
+
+
+def run(send, payloads, concurrency):
+    latencies = []
+    statuses = Counter()
+    lock = threading.Lock()
+
+    def one(payload):
+        start = time.perf_counter()
+        try:
+            status = send(payload)
+        except Exception:
+            status = "exception"
+        elapsed = time.perf_counter() - start
+        with lock:
+            latencies.append(elapsed)
+            statuses[status] += 1
+
+    wall_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(one, payloads))
+    wall = time.perf_counter() - wall_start
+    return sorted(latencies), statuses, wall
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load generator for /api/berechnen")
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="base URL of a running app")
+    target.add_argument("--in-process", action="store_true", help="use the Flask test client")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--plz-pool", type=int, default=50)
+    parser.add_argument("--reference-date", type=date.fromisoformat, default=REFERENCE_DATE,
+                        help="seasons are taken before this date (default: %(default)s)")
+    args = parser.parse_args()
+
+    payloads = make_payloads(args.requests, args.seed, args.plz_pool, args.reference_date)
+    send = in_process_sender() if args.in_process else http_sender(args.url)
+
+    latencies, statuses, wall = run(send, payloads, args.concurrency)
+
+    ms = [v * 1000 for v in latencies]
+    print(f"{len(payloads)} requests, concurrency {args.concurrency}, {wall:.2f} s")
+    print(f"  throughput: {len(payloads) / wall:.1f} req/s")
+    print(f"  latency ms: p50 {percentile(ms, 50):.1f}  p95 {percentile(ms, 95):.1f}  "
+          f"p99 {percentile(ms, 99):.1f}  max {ms[-1]:.1f}")
+    print("  status: " + ", ".join(f"{k}: {v}" for k, v in sorted(statuses.items(), key=str)))
+
+
+if __name__ == "__main__":
+    main()
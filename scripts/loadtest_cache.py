@@ -0,0 +1,138 @@
+"""
+Multi-worker load test for the shared cache.
+
+Starts a local Bright Sky stub that counts /weather calls, then runs the same
+set of /api/berechnen requests through 1, 2, 4, ... worker processes that all
+share one SQLite cache file. With a shared cache the number of upstream calls
+stays flat as the worker count grows; with HEIZLAST_CACHE=memory:// it grows
+with the number of workers.
+
+Usage:
+    python scripts/loadtest_cache.py [--workers 1,2,4,8] [--requests 40]
+                                     [--backend sqlite|memory]
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+from datetime import date, datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PLZ_SAMPLE = ["01067", "10115", "20095", "50667", "60311", "70173", "80331", "90402"]
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers /weather with a synthetic hourly series and counts calls."""
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query)
+        start = datetime.fromisoformat(query["date"][0])
+        end = datetime.fromisoformat(query["last_date"][0])
+        weather = []
+        ts = start
+        while ts <= end:
+            temp = 5.0 + 6.0 * ((ts.timetuple().tm_yday % 30) / 30.0) - 3.0
+            weather.append({"timestamp": ts.isoformat() + "+00:00", "temperature": round(temp, 1)})
+            ts += timedelta(hours=1)
+        body = json.dumps({"weather": weather}).encode("utf-8")
+        with self.server.lock:
+            self.server.calls += 1
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_stub():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubHandler)
+    server.calls = 0
+    server.lock = threading.Lock()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def make_payloads(n, seed=42):
+    """Realistic mix: few PLZ, overlapping periods with arbitrary start days."""
+    rng = random.Random(seed)
+    payloads = []
+    for _ in range(n):
+        start = date(2024, 1, 1) + timedelta(days=rng.randint(0, 40))
+        payloads.append({
+            "plz": rng.choice(PLZ_SAMPLE),
+            "datum_von": start.isoformat(),
+            "datum_bis": (start + timedelta(days=rng.choice([30, 60]))).isoformat(),
+            "gasverbrauch": rng.choice([3000, 5000, 8000]),
+            "wohnflaeche": 120,
+            "baujahr": 1975,
+        })
+    return payloads
+
+
+def worker(args):
+    payloads, seed = args
+    payloads = list(payloads)
+    random.Random(seed).shuffle(payloads)
+    sys.path.insert(0, ROOT)
+    from app import app
+
+    client = app.test_client()
+    errors = 0
+    for payload in payloads:
+        if client.post("/api/berechnen", json=payload).status_code != 200:
+            errors += 1
+    return errors
+
+
+def run(num_workers, payloads, backend, stub):
+    fd, db_path = tempfile.mkstemp(suffix=".db")
+    os.close(fd)
+    os.environ["HEIZLAST_CACHE"] = (
+        "sqlite:///" + db_path if backend == "sqlite" else "memory://"
+    )
+    os.environ["BRIGHTSKY_URL"] = "http://127.0.0.1:{}/weather".format(stub.server_port)
+
+    stub.calls = 0
+    # Every worker gets the full request mix in its own order, like nodes
+    # behind a load balancer
+    ctx = multiprocessing.get_context("spawn")
+    with ctx.Pool(num_workers) as pool:
+        errors = sum(pool.map(worker, [(payloads, i) for i in range(num_workers)]))
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(db_path + suffix):
+            os.unlink(db_path + suffix)
+    return stub.calls, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared-cache load test")
+    parser.add_argument("--workers", default="1,2,4,8")
+    parser.add_argument("--requests", type=int, default=40)
+    parser.add_argument("--backend", choices=("sqlite", "memory"), default="sqlite")
+    args = parser.parse_args()
+
+    stub = start_stub()
+    payloads = make_payloads(args.requests)
+
+    print(f"Backend: {args.backend}, {args.requests} requests per worker")
+    print(f"{'workers':>8} {'requests':>9} {'upstream':>9} {'errors':>7}")
+    for n in [int(w) for w in args.workers.split(",")]:
+        calls, errors = run(n, payloads, args.backend, stub)
+        print(f"{n:>8} {n * len(payloads):>9} {calls:>9} {errors:>7}")
+
+    stub.shutdown()
+
+
+if __name__ == "__main__":
+    main()
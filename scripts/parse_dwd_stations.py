@@ -5,15 +5,46 @@ Strategy:
 1. Try direct download from DWD opendata server
 2. Fall back to Bright Sky API to collect all DWD observation stations
 
-Writes filtered results (bis_datum >= 2024) to JSON.
+Writes filtered results (bis_datum >= 2024) to JSON. A diff against the
+previous station list is printed first; the output file is then replaced
+atomically. The script exits non-zero and leaves the previous file untouched
+if any Bright Sky grid query still fails after retries, or if the new list
+drops more than --max-removed (default 5 %) of the previous stations.
+
+Usage:
+    python scripts/parse_dwd_stations.py [--output PATH] [--brightsky-url URL]
+                                         [--workers N] [--skip-direct]
+                                         [--max-removed SHARE]
+
+For offline testing, start scripts/sources_stub.py (canned /sources
+responses), point --brightsky-url at it and pass --skip-direct.
 """
 
+import argparse
 import json
+import os
+import stat
 import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+OUTPUT = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "data", "dwd_stations.json",
+)
+
+BRIGHTSKY_URL = "https://api.brightsky.dev"
 
+# Parallel /sources queries (I/O-bound, threads share one pooled session)
+GRID_WORKERS = 8
 
-OUTPUT = "/home/user/wetter_Europa/data/dwd_stations.json"
+# Largest share of previous stations a refresh may drop before it is refused
+MAX_REMOVED_SHARE = 0.05
 
 DWD_URL = (
     "https://opendata.dwd.de/climate_environment/CDC/"
@@ -113,51 +144,100 @@ def guess_state(lat, lon):
     return ""
 
 
-def try_brightsky():
+def make_session(pool_size=GRID_WORKERS):
+    """Pooled HTTP session with retry/backoff for transient errors."""
+    retry = Retry(
+        total=3,
+        backoff_factor=0.5,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=("GET",),
+    )
+    adapter = HTTPAdapter(
+        pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+    )
+    session = requests.Session()
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def grid_points():
+    """Grid points across Germany to ensure we catch all stations."""
+    points = []
+    for lat in [47.5, 48.5, 49.5, 50.5, 51.5, 52.5, 53.5, 54.5]:
+        for lon in [6.5, 7.5, 8.5, 9.5, 10.5, 11.5, 12.5, 13.5, 14.5]:
+            points.append((lat, lon))
+    return points
+
+
+def fetch_sources(session, base_url, lat, lon):
+    """Query /sources at one grid point.
+
+    Returns a list of source dicts, or None if the query failed after the
+    session's retries (a missing grid point must not look like "no stations").
+    """
+    try:
+        resp = session.get(
+            base_url.rstrip("/") + "/sources",
+            params={"lat": lat, "lon": lon, "max_dist": 200000},
+            timeout=30,
+        )
+        resp.raise_for_status()
+        return resp.json().get("sources", [])
+    except Exception as e:
+        print(f"  Warning: query at ({lat},{lon}) failed: {e}")
+        return None
+
+
+def merge_sources(raw_stations, sources):
+    """Merge /sources results into raw_stations (keyed by dwd_station_id)."""
+    for src in sources:
+        sid = src.get("dwd_station_id")
+        obs_type = src.get("observation_type")
+
+        # Only include historical observation stations (these are the DWD climate stations)
+        if not sid or obs_type not in ("historical", "recent"):
+            continue
+
+        if sid in raw_stations:
+            # Update if this record has a more recent last_record
+            existing = raw_stations[sid]
+            if src.get("last_record", "") > existing.get("last_record", ""):
+                raw_stations[sid] = src
+        else:
+            raw_stations[sid] = src
+
+
+def try_brightsky(base_url=BRIGHTSKY_URL, workers=GRID_WORKERS):
     """
     Use the Bright Sky API to collect all DWD observation stations.
     We query at a grid of points across Germany with large max_dist to cover all stations.
+    The grid queries run in parallel through one pooled session with retry.
     Then deduplicate by dwd_station_id.
-    """
-    print("Querying Bright Sky API for DWD stations...")
 
-    # Grid points across Germany to ensure we catch all stations
-    grid_points = []
-    for lat in [47.5, 48.5, 49.5, 50.5, 51.5, 52.5, 53.5, 54.5]:
-        for lon in [6.5, 7.5, 8.5, 9.5, 10.5, 11.5, 12.5, 13.5, 14.5]:
-            grid_points.append((lat, lon))
+    Raises RuntimeError if any grid query failed, since the station list
+    would otherwise be silently incomplete.
+    """
+    print(f"Querying Bright Sky API ({base_url}) for DWD stations...")
 
-    seen_ids = set()
+    points = grid_points()
     raw_stations = {}
-
-    for lat, lon in grid_points:
-        try:
-            resp = requests.get(
-                "https://api.brightsky.dev/sources",
-                params={"lat": lat, "lon": lon, "max_dist": 200000},
-                timeout=30,
-            )
-            resp.raise_for_status()
-            data = resp.json()
-
-            for src in data.get("sources", []):
-                sid = src.get("dwd_station_id")
-                obs_type = src.get("observation_type")
-
-                # Only include historical observation stations (these are the DWD climate stations)
-                if not sid or obs_type not in ("historical", "recent"):
-                    continue
-
-                if sid in raw_stations:
-                    # Update if this record has a more recent last_record
-                    existing = raw_stations[sid]
-                    if src.get("last_record", "") > existing.get("last_record", ""):
-                        raw_stations[sid] = src
-                else:
-                    raw_stations[sid] = src
-
-        except Exception as e:
-            print(f"  Warning: query at ({lat},{lon}) failed: {e}")
+    failed = []
+
+    with make_session(workers) as session, ThreadPoolExecutor(max_workers=workers) as pool:
+        results = pool.map(lambda p: fetch_sources(session, base_url, *p), points)
+        # Merge in grid order so the result is independent of completion order
+        for point, sources in zip(points, results):
+            if sources is None:
+                failed.append(point)
+            else:
+                merge_sources(raw_stations, sources)
+
+    if failed:
+        raise RuntimeError(
+            f"{len(failed)} of {len(points)} grid queries failed: "
+            + ", ".join(f"({lat},{lon})" for lat, lon in failed)
+        )
 
     print(f"  Found {len(raw_stations)} unique DWD stations from Bright Sky")
 
@@ -207,21 +287,100 @@ def try_brightsky():
     return stations
 
 
-def main():
+def write_json_atomic(path, data):
+    """Write JSON via temp file + os.replace, so readers never see a partial file.
+
+    mkstemp creates the file with mode 0600; the previous file's mode (or
+    0644 for a new file) is restored before the replace.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        mode = stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        mode = 0o644
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-", suffix=".json")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+        os.chmod(tmp_path, mode)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load_previous(path):
+    """Previous station list, or an empty list if none exists."""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return []
+
+
+def diff_stations(old, new):
+    """Compare two station lists by id. Returns added/removed/changed ids."""
+    old_by_id = {s["id"]: s for s in old}
+    new_by_id = {s["id"]: s for s in new}
+    added = sorted(new_by_id.keys() - old_by_id.keys())
+    removed = sorted(old_by_id.keys() - new_by_id.keys())
+    changed = sorted(
+        sid for sid in new_by_id.keys() & old_by_id.keys()
+        if new_by_id[sid] != old_by_id[sid]
+    )
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def print_diff_report(diff, old, new):
+    """Print a short human-readable diff report."""
+    old_by_id = {s["id"]: s for s in old}
+    new_by_id = {s["id"]: s for s in new}
+    print(
+        f"\nDiff vs. previous list: +{len(diff['added'])} added, "
+        f"-{len(diff['removed'])} removed, ~{len(diff['changed'])} changed"
+    )
+    for sid in diff["added"]:
+        print(f"  + {sid} {new_by_id[sid]['name']}")
+    for sid in diff["removed"]:
+        print(f"  - {sid} {old_by_id[sid]['name']}")
+    for sid in diff["changed"]:
+        fields = [
+            k for k in sorted(old_by_id[sid].keys() | new_by_id[sid].keys())
+            if old_by_id[sid].get(k) != new_by_id[sid].get(k)
+        ]
+        print(f"  ~ {sid} {new_by_id[sid]['name']}: {', '.join(fields)}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--output", default=OUTPUT, help="output JSON (default: data/dwd_stations.json)")
+    parser.add_argument("--brightsky-url", default=BRIGHTSKY_URL, help="Bright Sky base URL (e.g. a local stub)")
+    parser.add_argument("--workers", type=int, default=GRID_WORKERS, help="parallel grid queries")
+    parser.add_argument("--skip-direct", action="store_true", help="skip the direct DWD download")
+    parser.add_argument(
+        "--max-removed", type=float, default=MAX_REMOVED_SHARE,
+        help="refuse to write if more than this share of previous stations is removed (default: 0.05)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
     stations = None
 
     # Try direct DWD download first
-    try:
-        print("Attempting direct DWD download...")
-        stations = try_direct_download()
-        print(f"Direct download succeeded: {len(stations)} stations")
-    except Exception as e:
-        print(f"Direct download failed: {e}")
+    if not args.skip_direct:
+        try:
+            print("Attempting direct DWD download...")
+            stations = try_direct_download()
+            print(f"Direct download succeeded: {len(stations)} stations")
+        except Exception as e:
+            print(f"Direct download failed: {e}")
 
     # Fall back to Bright Sky API
     if not stations:
         try:
-            stations = try_brightsky()
+            stations = try_brightsky(args.brightsky_url, args.workers)
             print(f"Bright Sky succeeded: {len(stations)} stations")
         except Exception as e:
             print(f"Bright Sky failed: {e}")
@@ -231,10 +390,21 @@ def main():
 
     stations.sort(key=lambda s: s["id"])
 
-    with open(OUTPUT, "w", encoding="utf-8") as f:
-        json.dump(stations, f, ensure_ascii=False, indent=2)
+    previous = load_previous(args.output)
+    diff = diff_stations(previous, stations)
+    print_diff_report(diff, previous, stations)
+
+    if previous and len(diff["removed"]) > args.max_removed * len(previous):
+        print(
+            f"\nRefusing to write: {len(diff['removed'])} of {len(previous)} previous "
+            f"stations would be removed (limit {args.max_removed:.0%}). "
+            f"{args.output} left unchanged."
+        )
+        sys.exit(1)
+
+    write_json_atomic(args.output, stations)
 
-    print(f"\nWrote {len(stations)} stations to {OUTPUT}")
+    print(f"\nWrote {len(stations)} stations to {args.output}")
     for s in stations[:5]:
         print(f"  {s}")
     print(f"  ... and {len(stations) - 5} more")
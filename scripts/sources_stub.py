@@ -0,0 +1,129 @@
+"""
+Local stub for the Bright Sky /sources endpoint.
+
+Serves canned sources built from a station list in the format of
+data/dwd_stations.json, so scripts/parse_dwd_stations.py can be run
+offline. Every station appears as a "recent" source plus an older
+"historical" record (to exercise deduplication) and the stub filters by
+lat/lon/max_dist like the real API. make_server(..., fail_points=...)
+answers 503 at the given grid points to exercise failure handling.
+
+Usage:
+    python scripts/sources_stub.py [--stations data/dwd_stations.json] [--port 8766]
+    python scripts/parse_dwd_stations.py --skip-direct \\
+        --brightsky-url http://127.0.0.1:8766 --output /tmp/stations.json
+
+With the default station list the refresh reproduces data/dwd_stations.json
+(empty diff).
+"""
+
+import argparse
+import json
+import math
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STATIONS = os.path.join(ROOT, "data", "dwd_stations.json")
+
+
+def _distance_m(lat1, lon1, lat2, lon2):
+    lat1, lon1, lat2, lon2 = map(math.radians, (lat1, lon1, lat2, lon2))
+    a = (math.sin((lat2 - lat1) / 2) ** 2
+         + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2)
+    return 6371000 * 2 * math.asin(math.sqrt(a))
+
+
+def _timestamp(yyyymmdd):
+    return "{}-{}-{}T00:00:00+00:00".format(yyyymmdd[:4], yyyymmdd[4:6], yyyymmdd[6:8])
+
+
+def sources_from_stations(stations):
+    """Canned /sources records for a station list."""
+    sources = []
+    for i, s in enumerate(stations):
+        common = {
+            "dwd_station_id": s["id"],
+            "station_name": s["name"],
+            "lat": s["lat"],
+            "lon": s["lon"],
+            "height": s["elevation"],
+            "first_record": _timestamp(s["from"]),
+        }
+        sources.append(dict(common, id=2 * i, observation_type="historical",
+                            last_record=_timestamp("20231231")))
+        sources.append(dict(common, id=2 * i + 1, observation_type="recent",
+                            last_record=_timestamp(s["to"])))
+    return sources
+
+
+class SourcesHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path.rstrip("/") != "/sources":
+            self._send(404, {"error": "not found"})
+            return
+        query = parse_qs(url.query)
+        try:
+            lat = float(query["lat"][0])
+            lon = float(query["lon"][0])
+            max_dist = float(query.get("max_dist", ["50000"])[0])
+        except (KeyError, ValueError):
+            self._send(400, {"error": "lat/lon required"})
+            return
+
+        with self.server.lock:
+            self.server.requests += 1
+        if (lat, lon) in self.server.fail_points:
+            self._send(503, {"error": "unavailable"})
+            return
+        found = [
+            src for src in self.server.sources
+            if _distance_m(lat, lon, src["lat"], src["lon"]) <= max_dist
+        ]
+        self._send(200, {"sources": found})
+
+    def _send(self, status, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def make_server(stations, host="127.0.0.1", port=0, fail_points=()):
+    """Create (but do not start) a /sources stub; port 0 picks a free port."""
+    server = ThreadingHTTPServer((host, port), SourcesHandler)
+    server.sources = sources_from_stations(stations)
+    server.fail_points = set(fail_points)
+    server.lock = threading.Lock()
+    server.requests = 0
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bright Sky /sources stub")
+    parser.add_argument("--stations", default=STATIONS, help="station list to serve")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    args = parser.parse_args()
+
+    with open(args.stations, "r", encoding="utf-8") as f:
+        stations = json.load(f)
+    server = make_server(stations, args.host, args.port)
+    print(f"Serving {len(stations)} stations on http://{args.host}:{server.server_port}/sources")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    print(f"{server.requests} requests")
+
+
+if __name__ == "__main__":
+    main()
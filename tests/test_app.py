@@ -0,0 +1,42 @@
+import pytest
+
+from app import _encode_series, _shape_response, app
+
+
+def test_encode_series_mit_luecke():
+    reihe = {"2024-01-01": 1.04, "2024-01-03": -2.46}
+    assert _encode_series(reihe, precision=1) == {"start": "2024-01-01", "values": [1.0, None, -2.5]}
+
+
+def test_encode_series_lueckenlos():
+    reihe = {"2024-01-02": 2.0, "2024-01-01": 1.0}
+    assert _encode_series(reihe) == {"start": "2024-01-01", "values": [1.0, 2.0]}
+
+
+def test_shape_response_compact_varianten():
+    result = {
+        "heizlast_kw": 8.1,
+        "sensitivitaet": {"min_kw": 7.0, "max_kw": 9.0, "varianten": [
+            {"heizgrenze": 14, "warmwasser_pct": 8, "heizlast_kw": 7.0, "spezifisch_w_m2": 50.0},
+            {"heizgrenze": 15, "warmwasser_pct": 12, "heizlast_kw": 9.0, "spezifisch_w_m2": 64.3},
+        ]},
+    }
+    kompakt = _shape_response(result, compact=True)
+    assert kompakt["sensitivitaet"]["varianten"] == {
+        "heizgrenze": [14, 15], "warmwasser_pct": [8, 12],
+        "heizlast_kw": [7.0, 9.0], "spezifisch_w_m2": [50.0, 64.3],
+    }
+    # Das (gecachte) Original bleibt unveraendert
+    assert isinstance(result["sensitivitaet"]["varianten"], list)
+
+
+@pytest.mark.parametrize("pfad", ["/api/berechnen", "/api/saison", "/api/waermepumpe"])
+@pytest.mark.parametrize("body,content_type", [
+    ("{kaputt", "application/json"),
+    ('{"plz": "10115"}', "text/plain"),
+    ("", "application/json"),
+])
+def test_kein_json_gibt_strukturierten_fehler(pfad, body, content_type):
+    antwort = app.test_client().post(pfad, data=body, content_type=content_type)
+    assert antwort.status_code == 400
+    assert antwort.get_json()["fehler"][0]["code"] == "json"
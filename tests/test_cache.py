@@ -0,0 +1,54 @@
+import time
+
+from utils import cache as cache_mod
+from utils.cache import MemoryCache, SQLiteCache
+
+
+def test_memory_cache_lru_bound():
+    c = MemoryCache(max_eintraege=3)
+    for key in "abc":
+        c.set(key, key)
+    c.get("a")
+    c.set("d", "d")
+    assert c.get("b") is None
+    assert [c.get(k) for k in "acd"] == ["a", "c", "d"]
+
+
+def test_memory_cache_add():
+    c = MemoryCache()
+    assert c.add("k", 1, ttl=60)
+    assert not c.add("k", 2, ttl=60)
+    c.delete("k")
+    assert c.add("k", 3)
+    assert c.get("k") == 3
+
+
+def test_sqlite_cache_purges_expired_rows(tmp_path, monkeypatch):
+    c = SQLiteCache(str(tmp_path / "cache.db"))
+    c.set("alt", 1, ttl=0.01)
+    c.set("dauer", 2)
+    time.sleep(0.02)
+    monkeypatch.setattr(c, "_naechstes_aufraeumen", 0.0)
+    c.set("neu", 3, ttl=60)
+    keys = {row[0] for row in c._conn().execute("SELECT key FROM cache")}
+    assert keys == {"dauer", "neu"}
+
+
+def test_sqlite_cache_add_takes_over_expired(tmp_path):
+    c = SQLiteCache(str(tmp_path / "cache.db"))
+    assert c.add("sperre", 1, ttl=0.01)
+    assert not c.add("sperre", 1, ttl=60)
+    time.sleep(0.02)
+    assert c.add("sperre", 1, ttl=60)
+
+
+def test_create_cache_memory():
+    assert isinstance(cache_mod.create_cache("memory://"), MemoryCache)
+
+
+def test_saison_store_ohne_verdraengung():
+    store = cache_mod.create_cache("memory://", max_eintraege=None)
+    for i in range(50):
+        store.set(str(i), i)
+    assert store.get("0") == 0
+    assert cache_mod.saison_store is not cache_mod.cache
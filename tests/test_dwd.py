@@ -0,0 +1,50 @@
+import threading
+import time
+from datetime import datetime, timedelta
+
+from utils import dwd
+from utils.cache import MemoryCache
+
+
+def test_abschnitte_calendar_aligned():
+    a = list(dwd._abschnitte(datetime(2024, 1, 3), datetime(2024, 1, 20)))
+    b = list(dwd._abschnitte(datetime(2024, 1, 7), datetime(2024, 1, 20)))
+    assert a == b
+    for von, bis in a:
+        assert (von - dwd._EPOCHE).days % dwd.ABSCHNITT_TAGE == 0
+        assert (bis - von).days == dwd.ABSCHNITT_TAGE - 1
+    assert a[0][0] <= datetime(2024, 1, 3) and a[-1][1] >= datetime(2024, 1, 20)
+
+
+def test_fetch_filters_to_range_and_single_flight(monkeypatch):
+    aufrufe = []
+
+    def fake_get(url, params, timeout=30):
+        aufrufe.append(params["date"])
+        time.sleep(0.05)
+        tag = datetime.fromisoformat(params["date"])
+        ende = datetime.fromisoformat(params["last_date"][:10])
+        weather = []
+        while tag <= ende:
+            weather.append({"timestamp": tag.isoformat(), "temperature": 1.0})
+            tag += timedelta(days=1)
+        return {"weather": weather}
+
+    monkeypatch.setattr(dwd, "cache", MemoryCache())
+    monkeypatch.setattr(dwd, "guarded_get", fake_get)
+
+    ergebnisse = []
+    threads = [
+        threading.Thread(target=lambda: ergebnisse.append(
+            dwd._fetch_hourly_by_day(50.0, 8.0, "2024-01-03", "2024-01-05")))
+        for _ in range(4)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(aufrufe) == 1
+    for tage, veraltet in ergebnisse:
+        assert sorted(tage) == ["2024-01-03", "2024-01-04", "2024-01-05"]
+        assert not veraltet
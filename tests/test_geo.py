@@ -0,0 +1,21 @@
+import json
+
+from utils import geo, heizlast
+
+
+def test_datensatz_braucht_plz_und_stationen(tmp_path, monkeypatch):
+    monkeypatch.setattr(geo, "DATA_DIR", str(tmp_path))
+    (tmp_path / "at").mkdir()
+    (tmp_path / "at" / "plz_coordinates.json").write_text(json.dumps({"1010": [48.21, 16.37]}))
+    mapper = geo.GeoMapper()
+
+    assert not mapper.datensatz_vorhanden("AT")
+    (tmp_path / "at" / "stations.json").write_text("[]")
+    assert mapper.datensatz_vorhanden("AT")
+    assert mapper.verfuegbare_laender() == ["AT"]
+
+
+def test_norm_temperatur_warnung():
+    assert heizlast.norm_temperatur_warnung("10115") is None
+    assert heizlast.get_norm_temperature("1010", "AT") == heizlast.NORM_TEMPERATUR_ERSATZ
+    assert "1010" in heizlast.norm_temperatur_warnung("1010", "AT")
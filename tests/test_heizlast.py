@@ -0,0 +1,38 @@
+import pytest
+
+from utils import heizlast
+from utils.heizlast import get_heizlast_schaetzung_baujahr, get_norm_temperature
+
+
+@pytest.mark.parametrize("baujahr,spezifisch", [
+    (-5, (50, 100)),
+    (0, (150, 170)),
+    (1918, (150, 170)),
+    (1919, (130, 160)),
+    (1983, (90, 120)),
+    (1984, (70, 100)),
+    (2099, (25, 45)),
+    (2100, (50, 100)),
+])
+def test_baujahr_grenzen(baujahr, spezifisch):
+    schaetzung = get_heizlast_schaetzung_baujahr(baujahr, 100)
+    assert (schaetzung["spezifisch_min"], schaetzung["spezifisch_max"]) == spezifisch
+    assert schaetzung["min_kw"] == spezifisch[0] / 10
+
+
+def test_norm_temperatur_plz_vor_region(monkeypatch):
+    monkeypatch.setitem(heizlast._plz_norm_temperaturen, "DE", {"83458": -18})
+    # PLZ-genauer Eintrag hat Vorrang, sonst gilt die Regionstabelle
+    assert get_norm_temperature("83458") == -18
+    assert get_norm_temperature("83022") == heizlast.NORM_AUSSENTEMPERATUR["83"]
+    assert get_norm_temperature("10115") == -14
+
+
+def test_norm_temperatur_region_nur_fuer_de(monkeypatch):
+    monkeypatch.setitem(heizlast._plz_norm_temperaturen, "AT", {})
+    assert get_norm_temperature("1010", "AT") == heizlast.NORM_TEMPERATUR_ERSATZ
+
+
+def test_mitgelieferte_tabelle_nur_abweichungen():
+    tabelle = heizlast._get_plz_norm_temperaturen("DE")
+    assert all(heizlast.NORM_AUSSENTEMPERATUR.get(plz[:2]) != t for plz, t in tabelle.items())
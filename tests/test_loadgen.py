@@ -0,0 +1,13 @@
+from datetime import date
+
+from scripts import loadgen
+
+
+def test_payloads_haengen_nur_vom_stichtag_ab():
+    a = loadgen.make_payloads(50, seed=3, plz_pool=10)
+    b = loadgen.make_payloads(50, seed=3, plz_pool=10, reference_date=loadgen.REFERENCE_DATE)
+    assert a == b
+    assert all(p["datum_bis"] < loadgen.REFERENCE_DATE.isoformat() for p in a)
+
+    spaeter = loadgen.make_payloads(50, seed=3, plz_pool=10, reference_date=date(2026, 7, 1))
+    assert spaeter[0]["datum_von"][:4] != a[0]["datum_von"][:4]
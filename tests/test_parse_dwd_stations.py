@@ -0,0 +1,96 @@
+import json
+import os
+import stat
+import threading
+
+import pytest
+
+from scripts import parse_dwd_stations, sources_stub
+
+STATIONS = [
+    {"id": "00011", "name": "Donaueschingen (Landeplatz)", "lat": 47.9736, "lon": 8.5205,
+     "elevation": 680, "state": "Baden-Württemberg", "from": "20100101", "to": "20260131"},
+    {"id": "01262", "name": "München-Flughafen", "lat": 48.3477, "lon": 11.8134,
+     "elevation": 446, "state": "Bayern", "from": "20100101", "to": "20260131"},
+    {"id": "09999", "name": "Stillgelegt", "lat": 50.0, "lon": 10.0,
+     "elevation": 300, "state": "Bayern", "from": "20100101", "to": "20201231"},
+]
+
+
+def _start_stub(request, **kwargs):
+    server = sources_stub.make_server(STATIONS, **kwargs)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    request.addfinalizer(server.shutdown)
+    return "http://127.0.0.1:{}".format(server.server_port)
+
+
+@pytest.fixture
+def stub_url(request):
+    return _start_stub(request)
+
+
+@pytest.fixture
+def no_backoff(monkeypatch):
+    """Retries ohne Wartezeit, damit Fehlerpfade schnell durchlaufen."""
+    make_session = parse_dwd_stations.make_session
+
+    def fast_session(pool_size=parse_dwd_stations.GRID_WORKERS):
+        session = make_session(pool_size)
+        for adapter in session.adapters.values():
+            adapter.max_retries.backoff_factor = 0
+        return session
+
+    monkeypatch.setattr(parse_dwd_stations, "make_session", fast_session)
+
+
+def test_refresh_against_stub(stub_url, tmp_path):
+    output = tmp_path / "stations.json"
+    parse_dwd_stations.main(["--skip-direct", "--brightsky-url", stub_url, "--output", str(output)])
+
+    with open(output, encoding="utf-8") as f:
+        stations = json.load(f)
+    # Stillgelegte Station (to < 2024) wird gefiltert, der Rest bleibt unveraendert
+    assert stations == STATIONS[:2]
+    assert stat.S_IMODE(os.stat(output).st_mode) == 0o644
+
+
+def test_write_json_atomic_keeps_mode(tmp_path):
+    output = tmp_path / "stations.json"
+    output.write_text("[]")
+    os.chmod(output, 0o664)
+    parse_dwd_stations.write_json_atomic(str(output), STATIONS)
+    assert stat.S_IMODE(os.stat(output).st_mode) == 0o664
+    assert [p.name for p in tmp_path.iterdir()] == ["stations.json"]
+
+
+def test_failed_grid_query_keeps_previous_file(request, no_backoff, tmp_path):
+    # Ein einziger Gitterpunkt, der auch nach Retries mit 503 antwortet
+    url = _start_stub(request, fail_points=[parse_dwd_stations.grid_points()[10]])
+    output = tmp_path / "stations.json"
+    output.write_text(json.dumps(STATIONS[:2]))
+
+    with pytest.raises(SystemExit) as exc:
+        parse_dwd_stations.main(["--skip-direct", "--brightsky-url", url, "--output", str(output)])
+    assert exc.value.code == 1
+    assert json.loads(output.read_text()) == STATIONS[:2]
+
+
+def test_shrunken_list_is_not_written(stub_url, tmp_path):
+    previous = STATIONS[:2] + [
+        dict(STATIONS[0], id="{:05d}".format(20000 + i), name="Alt {}".format(i))
+        for i in range(3)
+    ]
+    output = tmp_path / "stations.json"
+    output.write_text(json.dumps(previous))
+    args = ["--skip-direct", "--brightsky-url", stub_url, "--output", str(output)]
+
+    # 3 von 5 Stationen wuerden entfernt (60 % > 5 %)
+    with pytest.raises(SystemExit) as exc:
+        parse_dwd_stations.main(args)
+    assert exc.value.code == 1
+    assert json.loads(output.read_text()) == previous
+
+    # Mit ausdruecklich hoeherer Grenze wird geschrieben
+    parse_dwd_stations.main(args + ["--max-removed", "0.6"])
+    assert json.loads(output.read_text()) == STATIONS[:2]
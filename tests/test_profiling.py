@@ -0,0 +1,39 @@
+from flask import Flask
+
+from utils import profiling
+
+app = Flask(__name__)
+
+
+def _profiliert(monkeypatch, tmp_path):
+    monkeypatch.setattr(profiling, "AKTIV", True)
+    monkeypatch.setattr(profiling, "PROFILE_DIR", str(tmp_path))
+    monkeypatch.setattr(profiling, "PROFILE_SAMPLE_RATE", 1.0)
+
+    @profiling.profiled
+    def view():
+        return "ok"
+
+    return view
+
+
+def test_speicherfehler_bricht_request_nicht_ab(monkeypatch, tmp_path):
+    view = _profiliert(monkeypatch, tmp_path)
+
+    def kaputt(*args):
+        raise OSError("Datentraeger voll")
+
+    monkeypatch.setattr(profiling, "_speichern", kaputt)
+    with app.test_request_context():
+        assert view() == "ok"
+    assert not profiling._profil_lock.locked()
+
+
+def test_paralleler_request_laeuft_unprofiliert(monkeypatch, tmp_path):
+    view = _profiliert(monkeypatch, tmp_path)
+    with app.test_request_context():
+        with profiling._profil_lock:
+            assert view() == "ok"
+        assert list(tmp_path.iterdir()) == []
+        assert view() == "ok"
+    assert len(list(tmp_path.glob("*.prof"))) == 1
@@ -0,0 +1,15 @@
+import pytest
+
+from utils import replay
+
+
+def test_record_load_roundtrip(tmp_path):
+    replay.record(str(tmp_path), "/weather", {"lat": 52.5, "lon": 13.4}, {"weather": [1]})
+    assert replay.load(str(tmp_path), "/weather", {"lon": "13.4", "lat": "52.5"}) == {"weather": [1]}
+    assert replay.load(str(tmp_path), "/weather", {"lat": 0}) is None
+
+
+def test_record_removes_temp_file_on_failure(tmp_path):
+    with pytest.raises(TypeError):
+        replay.record(str(tmp_path), "/weather", {"lat": 1}, {"nicht_json": object()})
+    assert list(tmp_path.iterdir()) == []
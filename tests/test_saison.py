@@ -0,0 +1,70 @@
+import pytest
+
+from utils.saison import _regression, auswerten, neuer_zustand, zustand_aktualisieren
+
+
+def _tage(start, anzahl, temp):
+    return {"2024-01-{:02d}".format(start + i): temp for i in range(anzahl)}
+
+
+def _saison():
+    """Drei Intervalle, exakt nach Q = 2 * Tage + 4 * HGT (Heizgrenze 15 C)."""
+    z = neuer_zustand("10115", "2024-01-01T08:00", 0.0, wohnflaeche=100)
+    # 10 Tage bei 5 C: HGT 100 -> 420 kWh
+    z = zustand_aktualisieren(z, "2024-01-11T08:00", 420.0, _tage(1, 10, 5.0), 10.0)
+    # 10 Tage bei 10 C: HGT 50 -> 220 kWh
+    z = zustand_aktualisieren(z, "2024-01-21T08:00", 640.0, _tage(11, 10, 10.0), 10.0)
+    # 5 Tage bei 15 C: keine HGT -> 10 kWh
+    return zustand_aktualisieren(z, "2024-01-26T08:00", 650.0, _tage(21, 5, 15.0), 5.0)
+
+
+def test_zustand_kumuliert():
+    z = _saison()
+    assert z["intervalle"] == 3
+    assert z["messdauer_tage"] == 25.0
+    assert z["kalendertage"] == 25
+    assert z["heiztage"] == 20
+    assert z["hgt"] == 150.0
+    assert z["q_nutz"] == 650.0
+    assert z["letzte_ablesung"] == "2024-01-26T08:00"
+
+
+def test_regression_findet_a_und_b():
+    a, b = _regression(_saison())
+    assert a == pytest.approx(2.0)
+    assert b == pytest.approx(4.0)
+
+
+def test_regression_braucht_zwei_intervalle():
+    z = neuer_zustand("10115", "2024-01-01T08:00", 0.0, wohnflaeche=100)
+    z = zustand_aktualisieren(z, "2024-01-11T08:00", 420.0, _tage(1, 10, 5.0), 10.0)
+    assert _regression(z) is None
+
+
+def test_auswerten():
+    result = auswerten(_saison())
+    # Norm-Aussentemperatur Berlin -14 C -> dT 34 K
+    assert result["norm_aussentemperatur"] == -14
+    assert result["regression"] == {
+        "grundlast_kwh_tag": 2.0,
+        "waermeverlustkennwert_b": 4.0,
+        "heizlast_kw": round(4.0 * 34 / 24, 2),
+    }
+    # Automatische Grundlast: 5 von 25 Tagen ohne Heizung -> 20 % von 650 kWh
+    assert result["grundlast_methode"] == "automatisch"
+    assert result["warmwasser_kwh"] == 130.0
+    assert result["waermeverlustkennwert_b"] == round(520.0 / 150.0, 3)
+    assert result["warnungen"] == []
+
+
+def test_auswerten_ohne_ablesung():
+    z = neuer_zustand("10115", "2024-01-01T08:00", 0.0, wohnflaeche=100)
+    assert "error" in auswerten(z)
+
+
+def test_zaehler_rueckwaerts():
+    z = neuer_zustand("10115", "2024-01-01T08:00", 100.0, wohnflaeche=100)
+    with pytest.raises(ValueError):
+        zustand_aktualisieren(z, "2024-01-11T08:00", 50.0, _tage(1, 10, 5.0), 10.0)
+    with pytest.raises(ValueError):
+        zustand_aktualisieren(z, "2024-01-11T08:00", 150.0, {}, 10.0)
@@ -0,0 +1,95 @@
+import pytest
+
+from utils.schema import BERECHNEN, SAISON, WAERMEPUMPE
+
+
+@pytest.mark.parametrize("schema", [BERECHNEN, SAISON, WAERMEPUMPE])
+@pytest.mark.parametrize("data", [[1, 2], "abc", 5])
+def test_kein_objekt(schema, data):
+    werte, fehler = schema.validieren(data)
+    assert werte is None
+    assert fehler["fehler"] == [
+        {"feld": None, "code": "typ", "meldung": "Erwartet wird ein JSON-Objekt."}
+    ]
+
+
+def test_zustand_roundtrip():
+    from utils.saison import neuer_zustand
+    from utils.schema import ZUSTAND
+
+    werte, fehler = ZUSTAND.validieren(neuer_zustand("10115", "2025-01-01T08:00", 50, 120))
+    assert fehler is None
+    assert werte["letzte_ablesung"].isoformat() == "2025-01-01T08:00:00"
+
+
+@pytest.mark.parametrize("zustand", [{}, {"letzte_ablesung": "x"}])
+def test_zustand_unvollstaendig(zustand):
+    from utils.schema import ZUSTAND
+
+    werte, fehler = ZUSTAND.validieren(zustand)
+    assert werte is None
+    assert fehler["fehler"]
+
+
+@pytest.mark.parametrize("jahr", [-5, 12, 2009])
+def test_referenzjahr_vor_brightsky(jahr):
+    werte, fehler = WAERMEPUMPE.validieren(
+        {"plz": "10115", "waermeverlustkennwert_b": 300, "referenzjahr": jahr}
+    )
+    assert fehler["fehler"][0]["feld"] == "referenzjahr"
+    assert fehler["fehler"][0]["code"] == "bereich"
+
+
+@pytest.mark.parametrize("land,plz,ok", [
+    ("DE", "10115", True),
+    ("DE", "1067", True),
+    ("AT", "1010", True),
+    ("AT", "10115", False),
+    ("CH", "80001", False),
+])
+def test_plz_stellen_je_land(land, plz, ok):
+    werte, fehler = WAERMEPUMPE.validieren(
+        {"plz": plz, "land": land, "waermeverlustkennwert_b": 300}
+    )
+    if ok:
+        assert fehler is None
+    else:
+        assert fehler["fehler"] == [{
+            "feld": "plz", "code": "ungueltig",
+            "meldung": "Bitte eine gueltige 4-stellige PLZ eingeben.",
+        }]
+
+
+def test_fields_nur_bekannte_abschnitte():
+    basis = {"plz": "10115", "datum_von": "2024-01-01", "datum_bis": "2024-02-01",
+             "gasverbrauch": 1000, "wohnflaeche": 100, "baujahr": 1970}
+    werte, fehler = BERECHNEN.validieren(dict(basis, fields="heizlast_kw,daily_temps"))
+    assert werte["fields"] == {"heizlast_kw", "daily_temps"}
+
+    werte, fehler = BERECHNEN.validieren(dict(basis, fields="heizlast_kw,foo"))
+    assert fehler["fehler"][0]["feld"] == "fields"
+    assert fehler["fehler"][0]["code"] == "auswahl"
+    assert "foo" in fehler["error"]
+
+
+def test_geraete_begrenzt():
+    from utils.schema import MAX_GERAETE
+
+    basis = {"plz": "10115", "waermeverlustkennwert_b": 300}
+    werte, fehler = WAERMEPUMPE.validieren(
+        dict(basis, geraete=[{"leistung_kw": 5}] * (MAX_GERAETE + 1))
+    )
+    assert fehler["fehler"][0]["feld"] == "geraete"
+    assert fehler["fehler"][0]["code"] == "bereich"
+
+    werte, fehler = WAERMEPUMPE.validieren(dict(basis, geraete=[{"leistung_kw": 0}]))
+    assert fehler["fehler"][0]["code"] == "bereich"
+    werte, fehler = WAERMEPUMPE.validieren(dict(basis, geraete=[{"leistung_kw": 5}] * MAX_GERAETE))
+    assert fehler is None
+
+
+@pytest.mark.parametrize("wert", ["nan", "inf", "-inf", float("nan")])
+def test_float_nicht_endlich(wert):
+    werte, fehler = WAERMEPUMPE.validieren({"plz": "10115", "waermeverlustkennwert_b": wert})
+    assert fehler["fehler"][0]["feld"] == "waermeverlustkennwert_b"
+    assert fehler["fehler"][0]["code"] == "typ"
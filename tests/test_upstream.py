@@ -0,0 +1,115 @@
+import pytest
+
+from utils import upstream
+
+
+class _RejectingBucket:
+    def acquire(self, timeout):
+        return False
+
+
+def _half_open_breaker():
+    breaker = upstream.CircuitBreaker(threshold=1, cooldown=0.0)
+    breaker.record(False)
+    return breaker
+
+
+def test_half_open_probe_released_when_bucket_rejects(monkeypatch):
+    breaker = _half_open_breaker()
+    monkeypatch.setattr(upstream, "breaker", breaker)
+    monkeypatch.setattr(upstream, "bucket", _RejectingBucket())
+
+    with pytest.raises(upstream.UpstreamError) as exc:
+        upstream.guarded_get("http://127.0.0.1:9/weather", params={})
+    assert exc.value.gedrosselt
+
+    # Der Probe-Slot muss wieder frei sein, sonst bleibt der Breaker offen
+    assert breaker.allow()
+
+
+def test_half_open_probe_released_when_limiter_rejects(monkeypatch):
+    breaker = _half_open_breaker()
+    limiter = upstream.AdaptiveLimiter(minimum=1, maximum=2, latency_limit=5.0)
+    limiter.limit = 0
+    monkeypatch.setattr(upstream, "breaker", breaker)
+    monkeypatch.setattr(upstream, "limiter", limiter)
+    monkeypatch.setattr(upstream, "WARTEZEIT_MAX_S", 0.0)
+
+    with pytest.raises(upstream.UpstreamError):
+        upstream.guarded_get("http://127.0.0.1:9/weather", params={})
+
+    assert breaker.allow()
+
+
+def test_half_open_allows_single_probe():
+    breaker = _half_open_breaker()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.record(True)
+    assert breaker.allow()
+
+
+class _Antwort:
+    status_code = 200
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return {"weather": []}
+
+
+def test_aufzeichnungsfehler_bricht_request_nicht_ab(monkeypatch, tmp_path):
+    kein_verzeichnis = tmp_path / "datei"
+    kein_verzeichnis.write_text("")
+    monkeypatch.setattr(upstream, "breaker", upstream.CircuitBreaker(5, 30.0))
+    monkeypatch.setattr(upstream.requests, "get", lambda *a, **k: _Antwort())
+    monkeypatch.setattr(upstream.replay, "RECORD_DIR", str(kein_verzeichnis / "store"))
+
+    assert upstream.guarded_get("http://stub/weather", params={"lat": 1}) == {"weather": []}
+
+
+class _Status(_Antwort):
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise upstream.requests.HTTPError(str(self.status_code))
+
+
+@pytest.mark.parametrize("status,oeffnet", [(404, False), (400, False), (429, True), (500, True), (503, True)])
+def test_breaker_zaehlt_nur_upstream_fehler(monkeypatch, status, oeffnet):
+    breaker = upstream.CircuitBreaker(threshold=2, cooldown=30.0)
+    monkeypatch.setattr(upstream, "breaker", breaker)
+    monkeypatch.setattr(upstream, "bucket", upstream.TokenBucket(1000, 1000))
+    monkeypatch.setattr(upstream, "limiter", upstream.AdaptiveLimiter(1, 4, 5.0))
+    monkeypatch.setattr(upstream.requests, "get", lambda *a, **k: _Status(status))
+
+    for _ in range(3):
+        with pytest.raises(upstream.UpstreamError):
+            upstream.guarded_get("http://stub/weather", params={})
+    assert breaker.allow() is not oeffnet
+
+
+def test_breaker_zaehlt_verbindungsfehler(monkeypatch):
+    breaker = upstream.CircuitBreaker(threshold=2, cooldown=30.0)
+    monkeypatch.setattr(upstream, "breaker", breaker)
+
+    def kaputt(*args, **kwargs):
+        raise upstream.requests.ConnectionError("weg")
+
+    monkeypatch.setattr(upstream.requests, "get", kaputt)
+    for _ in range(2):
+        with pytest.raises(upstream.UpstreamError):
+            upstream.guarded_get("http://stub/weather", params={})
+    assert not breaker.allow()
+
+
+def test_halb_offen_4xx_gibt_probe_frei(monkeypatch):
+    breaker = _half_open_breaker()
+    monkeypatch.setattr(upstream, "breaker", breaker)
+    monkeypatch.setattr(upstream.requests, "get", lambda *a, **k: _Status(404))
+    with pytest.raises(upstream.UpstreamError):
+        upstream.guarded_get("http://stub/weather", params={})
+    assert breaker.allow()
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from utils.waermepumpe import simuliere_waermepumpen, stundenprofil
+
+# 100 h bei -10 C, 100 h bei 0 C, 100 h bei 20 C (ueber der Heizgrenze).
+# b = 2.4 kWh/(Tag*K) -> Bedarf 0.1 kW/K: 3 kW, 2 kW, 0 kW; 500 kWh gesamt.
+TEMPS = np.repeat([-10.0, 0.0, 20.0], 100)
+KONSTANT = {"leistung_kw": 2.5, "leistung_minus7_kw": 2.5}
+
+
+def _simuliere(geraete):
+    return simuliere_waermepumpen(TEMPS, b=2.4, t_norm=-12.0, geraete=geraete)
+
+
+def test_kennzahlen_konstante_leistung():
+    result = _simuliere([dict(KONSTANT, name="WP")])
+    assert result["jahresbedarf_kwh"] == 500.0
+    assert result["heizstunden"] == 200
+    assert result["spitzenlast_kw"] == 3.0
+
+    wp = result["geraete"][0]
+    # Heizgerade 2 - 0.1*T schneidet 2.5 kW bei -5 C
+    assert wp["bivalenzpunkt_c"] == -5.0
+    # 100 h * 2.5 kW + 100 h * 2 kW = 450 kWh von 500 kWh
+    assert wp["deckungsgrad_energie_pct"] == 90.0
+    assert wp["heizstab_kwh"] == 50.0
+    # Nur die 200 Heizstunden zaehlen, davon deckt das Geraet die 100 bei 0 C
+    assert wp["deckungsgrad_stunden_pct"] == 50.0
+    assert wp["vollbenutzungsstunden"] == 180
+
+
+def test_zu_kleines_geraet_ohne_sommerstunden():
+    wp = _simuliere([{"leistung_kw": 0.1, "leistung_minus7_kw": 0.1}])["geraete"][0]
+    assert wp["deckungsgrad_stunden_pct"] == 0.0
+    assert wp["deckungsgrad_energie_pct"] == 4.0
+    # Deckt schon an der Heizgrenze nicht: Bivalenzpunkt = Heizgrenze
+    assert wp["bivalenzpunkt_c"] == 15.0
+
+
+def test_grosses_geraet_deckt_alles():
+    wp = _simuliere([{"leistung_kw": 5.0, "leistung_minus7_kw": 5.0}])["geraete"][0]
+    assert wp["deckungsgrad_energie_pct"] == 100.0
+    assert wp["deckungsgrad_stunden_pct"] == 100.0
+    assert wp["bivalenzpunkt_c"] == -30.0
+
+
+def test_stundenprofil():
+    profil = stundenprofil({
+        "2024-01-01": [float(h) for h in range(24)],
+        "2024-01-02": [3.0],
+        "2024-01-03": [0.0, 23.0],
+        "2024-01-04": [],
+    })
+    assert profil.shape == (72,)
+    assert np.array_equal(profil[:24], np.arange(24.0))
+    assert np.all(profil[24:48] == 3.0)
+    assert profil[48:72] == pytest.approx(np.arange(24.0))
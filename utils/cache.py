@@ -0,0 +1,197 @@
+"""
+Cache fuer Wetterreihen und Berechnungsergebnisse.
+
+Das Backend wird ueber die Umgebungsvariable HEIZLAST_CACHE gewaehlt:
+
+    memory://                 Default, nur innerhalb eines Prozesses
+    sqlite:////pfad/cache.db  geteilt zwischen Workern auf demselben Host
+    redis://host:6379/0       geteilt auch zwischen Hosts, benoetigt 'redis'
+
+Fuer mehrere Nodes Redis verwenden: SQLite laeuft im WAL-Modus, der
+Shared Memory braucht und auf Netzwerk-Dateisystemen (NFS, SMB, geteilte
+Volumes) die Datenbank beschaedigen kann.
+
+HEIZLAST_SAISON_STORE waehlt getrennt davon den Speicher fuer laufende
+Saisons (saison_store, ohne LRU-Verdraengung).
+
+Alle Backends speichern JSON-serialisierbare Werte mit optionaler TTL [s].
+add() setzt nur, wenn der Schluessel fehlt oder abgelaufen ist, und eignet
+sich damit als prozessuebergreifende Sperre (siehe utils.dwd).
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Maximale Eintraege im Speicher-Cache (LRU-Verdraengung)
+MEMORY_MAX_EINTRAEGE = int(os.environ.get("HEIZLAST_CACHE_MAX_EINTRAEGE", "10000"))
+
+# Abstand, in dem SQLite abgelaufene Zeilen loescht [s]
+SQLITE_AUFRAEUMEN_S = 300
+
+
+class MemoryCache:
+    """Prozess-lokaler Cache (Default), begrenzt auf max_eintraege (LRU; None = unbegrenzt)."""
+
+    def __init__(self, max_eintraege=MEMORY_MAX_EINTRAEGE):
+        self.max_eintraege = max_eintraege
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lebend(self, key, now):
+        entry = self._data.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] < now:
+            del self._data[key]
+            return None
+        return entry
+
+    def get(self, key):
+        with self._lock:
+            entry = self._lebend(key, time.time())
+            if entry is None:
+                return None
+            self._data.move_to_end(key)
+            return entry[0]
+
+    def _setzen(self, key, value, ttl):
+        expires = time.time() + ttl if ttl else None
+        self._data[key] = (value, expires)
+        self._data.move_to_end(key)
+        while self.max_eintraege is not None and len(self._data) > self.max_eintraege:
+            self._data.popitem(last=False)
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._setzen(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        with self._lock:
+            if self._lebend(key, time.time()) is not None:
+                return False
+            self._setzen(key, value, ttl)
+            return True
+
+    def delete(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+
+class SQLiteCache:
+    """
+    Cache in einer SQLite-Datei. Mehrere Prozesse auf demselben Host teilen
+    sich dieselbe Datei; sie muss auf einem lokalen Dateisystem liegen (WAL,
+    siehe Moduldoku).
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._naechstes_aufraeumen = 0.0
+        with self._conn() as conn:
+            # WAL: Leser blockieren Schreiber nicht; nur auf lokalen Dateisystemen
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL)"
+            )
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        row = self._conn().execute(
+            "SELECT value, expires FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        value, expires = row
+        if expires is not None and expires < time.time():
+            return None
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        now = time.time()
+        expires = now + ttl if ttl else None
+        with self._conn() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires),
+            )
+            if now >= self._naechstes_aufraeumen:
+                self._naechstes_aufraeumen = now + SQLITE_AUFRAEUMEN_S
+                conn.execute(
+                    "DELETE FROM cache WHERE expires IS NOT NULL AND expires < ?", (now,)
+                )
+
+    def add(self, key, value, ttl=None):
+        now = time.time()
+        expires = now + ttl if ttl else None
+        with self._conn() as conn:
+            conn.execute(
+                "DELETE FROM cache WHERE key = ? AND expires IS NOT NULL AND expires < ?",
+                (key, now),
+            )
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO cache (key, value, expires) VALUES (?, ?, ?)",
+                (key, json.dumps(value), expires),
+            )
+            return cur.rowcount == 1
+
+    def delete(self, key):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM cache WHERE key = ?", (key,))
+
+
+class RedisCache:
+    """Cache in Redis (oder einem Redis-kompatiblen Server)."""
+
+    def __init__(self, url):
+        import redis  # optional, nur fuer dieses Backend noetig
+
+        self._client = redis.Redis.from_url(url)
+
+    def get(self, key):
+        value = self._client.get(key)
+        return json.loads(value) if value is not None else None
+
+    def set(self, key, value, ttl=None):
+        self._client.set(key, json.dumps(value), ex=int(ttl) if ttl else None)
+
+    def add(self, key, value, ttl=None):
+        return bool(self._client.set(key, json.dumps(value), ex=int(ttl) if ttl else None, nx=True))
+
+    def delete(self, key):
+        self._client.delete(key)
+
+
+def create_cache(url, max_eintraege=MEMORY_MAX_EINTRAEGE):
+    """Cache-Backend aus einer URL erzeugen (max_eintraege gilt nur fuer memory://)."""
+    if not url or url.startswith("memory://"):
+        return MemoryCache(max_eintraege)
+    if url.startswith("sqlite:///"):
+        return SQLiteCache(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisCache(url)
+    raise ValueError("Unbekanntes Cache-Backend: {}".format(url))
+
+
+# Singleton-Instanz
+cache = create_cache(os.environ.get("HEIZLAST_CACHE", "memory://"))
+
+# Dauerhafter Zustand (laufende Saisons) getrennt vom Cache, damit Wetterbloecke
+# und Ergebnisse ihn nicht aus dem LRU verdraengen. Ohne HEIZLAST_SAISON_STORE
+# dasselbe Backend wie HEIZLAST_CACHE, bei memory:// aber ohne Verdraengung
+# (und damit nicht ueber Neustarts hinweg: fuer Produktion sqlite:/// oder redis://).
+saison_store = create_cache(
+    os.environ.get("HEIZLAST_SAISON_STORE") or os.environ.get("HEIZLAST_CACHE", "memory://"),
+    max_eintraege=None,
+)
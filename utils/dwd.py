@@ -7,11 +7,156 @@ Bright Sky ist kostenlos, braucht keinen API-Key und hat CORS-Support.
 API-Doku: https://brightsky.dev/docs/
 """
 
-import requests
-from datetime import datetime, timedelta
+import os
+import time
 
+from datetime import date, datetime, timedelta
 
-BRIGHTSKY_URL = "https://api.brightsky.dev/weather"
+from utils.cache import cache
+from utils.upstream import UpstreamError, guarded_get
+
+
+BRIGHTSKY_URL = os.environ.get("BRIGHTSKY_URL", "https://api.brightsky.dev/weather")
+
+# Cache-TTL fuer Abschnitte, die noch nachgeliefert werden koennen [s].
+# Abgeschlossene Abschnitte (aelter als 2 Tage) werden ohne TTL gecacht.
+# Zusaetzlich bleibt eine veraltete Kopie ohne TTL liegen, die bei
+# gedrosseltem oder ausgefallenem Upstream ausgeliefert wird.
+CACHE_TTL_AKTUELL = 3600
+
+# Bloecke zu 10 Tagen, gezaehlt ab dem 1.1.1970
+ABSCHNITT_TAGE = 10
+_EPOCHE = datetime(1970, 1, 1)
+
+# Single-Flight: Sperrdauer und Abfrageintervall beim Warten [s]
+ABRUF_SPERRE_S = 30
+ABRUF_WARTEN_S = 0.05
+
+
+def _abschnitte(dt_from, dt_to):
+    """Feste Kalenderbloecke (ab _EPOCHE), die [dt_from, dt_to] ueberdecken."""
+    tage = (dt_from - _EPOCHE).days
+    block = _EPOCHE + timedelta(days=tage - tage % ABSCHNITT_TAGE)
+    while block <= dt_to:
+        yield block, block + timedelta(days=ABSCHNITT_TAGE - 1)
+        block += timedelta(days=ABSCHNITT_TAGE)
+
+
+def _abschnitt_abrufen(lat, lon, block_von, block_bis, cache_key):
+    """
+    Einen Block von Bright Sky laden und cachen.
+
+    Rückgabe: (chunk_temps, veraltet) oder ein Fehler-Dictionary
+    """
+    # Nicht ueber heute hinaus abfragen; der Cache-Schluessel bleibt der Block
+    abfrage_bis = min(block_bis, datetime.combine(date.today(), datetime.min.time()))
+    params = {
+        "lat": lat,
+        "lon": lon,
+        "date": block_von.strftime("%Y-%m-%dT00:00:00"),
+        "last_date": abfrage_bis.strftime("%Y-%m-%dT23:59:59"),
+    }
+
+    try:
+        data = guarded_get(BRIGHTSKY_URL, params=params, timeout=30)
+    except UpstreamError as e:
+        # Degradierter Modus: veraltete Kopie statt Fehler
+        chunk_temps = cache.get("stale:" + cache_key)
+        if chunk_temps is None:
+            return {
+                "error": f"DWD-Datenabruf fehlgeschlagen: {str(e)}",
+                "gedrosselt": e.gedrosselt,
+            }
+        return chunk_temps, True
+
+    chunk_temps = {}
+    for entry in data.get("weather", []):
+        ts = entry.get("timestamp", "")
+        temp = entry.get("temperature")
+        if temp is not None and ts:
+            day = ts[:10]
+            if day not in chunk_temps:
+                chunk_temps[day] = []
+            chunk_temps[day].append(temp)
+
+    abgeschlossen = block_bis.date() < date.today() - timedelta(days=2)
+    if abgeschlossen:
+        cache.set(cache_key, chunk_temps)
+    else:
+        cache.set(cache_key, chunk_temps, CACHE_TTL_AKTUELL)
+        cache.set("stale:" + cache_key, chunk_temps)
+    return chunk_temps, False
+
+
+def _abschnitt_laden(lat, lon, block_von, block_bis):
+    """
+    Block aus dem Cache oder von Bright Sky.
+
+    Gleichzeitige Fehlschlaege fuer denselben Block (auch aus anderen
+    Workern, sofern der Cache geteilt ist) laden nur einmal: wer die Sperre
+    "lock:<key>" bekommt, ruft ab; die anderen warten auf den Cache-Eintrag.
+    """
+    cache_key = "dwd:{:.4f}:{:.4f}:{}:{}".format(
+        lat, lon, block_von.strftime("%Y-%m-%d"), block_bis.strftime("%Y-%m-%d")
+    )
+    chunk_temps = cache.get(cache_key)
+    if chunk_temps is not None:
+        return chunk_temps, False
+
+    sperre = "lock:" + cache_key
+    if not cache.add(sperre, 1, ABRUF_SPERRE_S):
+        deadline = time.monotonic() + ABRUF_SPERRE_S
+        while time.monotonic() < deadline:
+            time.sleep(ABRUF_WARTEN_S)
+            chunk_temps = cache.get(cache_key)
+            if chunk_temps is not None:
+                return chunk_temps, False
+            # Abruf des anderen fehlgeschlagen: selbst versuchen
+            if cache.add(sperre, 1, ABRUF_SPERRE_S):
+                break
+        else:
+            return _abschnitt_abrufen(lat, lon, block_von, block_bis, cache_key)
+
+    try:
+        # Der vorherige Inhaber kann den Block gerade eben gespeichert haben
+        chunk_temps = cache.get(cache_key)
+        if chunk_temps is not None:
+            return chunk_temps, False
+        return _abschnitt_abrufen(lat, lon, block_von, block_bis, cache_key)
+    finally:
+        cache.delete(sperre)
+
+
+def _fetch_hourly_by_day(lat, lon, date_from, date_to):
+    """
+    Stuendliche Temperaturen blockweise (mit Cache) abrufen.
+
+    Bright Sky liefert hoechstens ~10 Tage pro Request. Die Bloecke liegen
+    fest im Kalender, damit sich Anfragen mit unterschiedlichem Startdatum
+    dieselben Cache-Eintraege teilen; Tage ausserhalb des Zeitraums werden
+    verworfen.
+
+    Rückgabe:
+        ({Datum: [Stundenwerte]}, veraltet) oder ein Fehler-Dictionary
+    """
+    all_daily_temps = {}
+    veraltet = False
+
+    dt_from = datetime.strptime(date_from, "%Y-%m-%d")
+    dt_to = datetime.strptime(date_to, "%Y-%m-%d")
+
+    for block_von, block_bis in _abschnitte(dt_from, dt_to):
+        geladen = _abschnitt_laden(lat, lon, block_von, block_bis)
+        if isinstance(geladen, dict):
+            return geladen
+        chunk_temps, chunk_veraltet = geladen
+        veraltet = veraltet or chunk_veraltet
+
+        for day, temps in chunk_temps.items():
+            if date_from <= day <= date_to:
+                all_daily_temps.setdefault(day, []).extend(temps)
+
+    return all_daily_temps, veraltet
 
 
 def get_temperature_data(lat: float, lon: float, date_from: str, date_to: str) -> dict:
@@ -28,40 +173,10 @@ def get_temperature_data(lat: float, lon: float, date_from: str, date_to: str) -
         Dictionary mit Temperaturdaten und Statistiken
     """
     # Bright Sky liefert stündliche Daten, wir aggregieren zu Tagesmitteln
-    all_daily_temps = {}
-
-    # Bright Sky limitiert auf ~10 Tage pro Request, also aufteilen
-    dt_from = datetime.strptime(date_from, "%Y-%m-%d")
-    dt_to = datetime.strptime(date_to, "%Y-%m-%d")
-
-    current = dt_from
-    while current <= dt_to:
-        chunk_end = min(current + timedelta(days=9), dt_to)
-
-        params = {
-            "lat": lat,
-            "lon": lon,
-            "date": current.strftime("%Y-%m-%dT00:00:00"),
-            "last_date": chunk_end.strftime("%Y-%m-%dT23:59:59"),
-        }
-
-        try:
-            resp = requests.get(BRIGHTSKY_URL, params=params, timeout=30)
-            resp.raise_for_status()
-            data = resp.json()
-        except requests.RequestException as e:
-            return {"error": f"DWD-Datenabruf fehlgeschlagen: {str(e)}"}
-
-        for entry in data.get("weather", []):
-            ts = entry.get("timestamp", "")
-            temp = entry.get("temperature")
-            if temp is not None and ts:
-                day = ts[:10]
-                if day not in all_daily_temps:
-                    all_daily_temps[day] = []
-                all_daily_temps[day].append(temp)
-
-        current = chunk_end + timedelta(days=1)
+    fetched = _fetch_hourly_by_day(lat, lon, date_from, date_to)
+    if isinstance(fetched, dict):
+        return fetched
+    all_daily_temps, veraltet = fetched
 
     if not all_daily_temps:
         return {"error": "Keine Temperaturdaten für den Zeitraum gefunden."}
@@ -82,4 +197,22 @@ def get_temperature_data(lat: float, lon: float, date_from: str, date_to: str) -
         "min_temperature": round(min_temp, 1),
         "max_temperature": round(max_temp, 1),
         "num_days": len(daily_means),
+        "veraltet": veraltet,
     }
+
+
+def get_hourly_temperatures(lat: float, lon: float, date_from: str, date_to: str) -> dict:
+    """
+    Stuendliche Temperaturen (z.B. fuer ein Referenzjahr) abrufen.
+
+    Rückgabe:
+        Dictionary mit {Datum: [Stundenwerte]} unter "hourly" oder "error"
+    """
+    fetched = _fetch_hourly_by_day(lat, lon, date_from, date_to)
+    if isinstance(fetched, dict):
+        return fetched
+    hourly, veraltet = fetched
+    hourly = {day: temps for day, temps in sorted(hourly.items()) if date_from <= day <= date_to}
+    if not hourly:
+        return {"error": "Keine Temperaturdaten für den Zeitraum gefunden."}
+    return {"hourly": hourly, "veraltet": veraltet}
@@ -1,5 +1,10 @@
 """
-Geo-Mapping: PLZ → nächste DWD-Wetterstation.
+Geo-Mapping: PLZ → nächste Wetterstation.
+
+Die Daten sind nach Land partitioniert und werden erst beim ersten Zugriff
+auf das jeweilige Land geladen (siehe LAENDER). Für die Stationssuche wird
+pro Land ein Gitterindex (1°-Zellen) aufgebaut, sodass die Suche nur die
+Zellen um die PLZ prüft statt aller Stationen.
 
 Verwendet Haversine-Distanz für die Berechnung.
 """
@@ -10,6 +15,33 @@ import os
 
 DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 
+# Datenpartitionen je Land (Pfade relativ zu DATA_DIR).
+# nachbarn: Länder, deren Stationen zusätzlich durchsucht werden
+# (z.B. DWD-Stationen für grenznahe österreichische PLZ).
+LAENDER = {
+    "DE": {
+        "plz_stellen": 5,
+        "plz_datei": "plz_coordinates.json",
+        "stationen_datei": "dwd_stations.json",
+        "nachbarn": (),
+    },
+    "AT": {
+        "plz_stellen": 4,
+        "plz_datei": os.path.join("at", "plz_coordinates.json"),
+        "stationen_datei": os.path.join("at", "stations.json"),
+        "nachbarn": ("DE",),
+    },
+    "CH": {
+        "plz_stellen": 4,
+        "plz_datei": os.path.join("ch", "plz_coordinates.json"),
+        "stationen_datei": os.path.join("ch", "stations.json"),
+        "nachbarn": ("DE",),
+    },
+}
+
+# Mindestabstand je Grad (leicht unter 111.2 km als Sicherheitsmarge)
+_KM_PRO_GRAD = 110.0
+
 
 def _haversine(lat1, lon1, lat2, lon2):
     """Haversine-Distanz in km zwischen zwei Koordinaten."""
@@ -25,38 +57,127 @@ def _haversine(lat1, lon1, lat2, lon2):
     return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
+def _load_json(relpath):
+    """JSON aus DATA_DIR laden; None, wenn die Partition nicht vorhanden ist."""
+    path = os.path.join(DATA_DIR, relpath)
+    if not os.path.exists(path):
+        return None
+    with open(path, "r") as f:
+        return json.load(f)
+
+
+class StationIndex:
+    """Gitterindex über Stationen (1°x1°-Zellen) für die Nächste-Station-Suche."""
+
+    def __init__(self, stations):
+        self._cells = {}
+        for station in stations:
+            key = (math.floor(station["lat"]), math.floor(station["lon"]))
+            self._cells.setdefault(key, []).append(station)
+        if self._cells:
+            rows = [i for i, _ in self._cells]
+            cols = [j for _, j in self._cells]
+            self._extent = (min(rows), max(rows), min(cols), max(cols))
+
+    def nearest(self, lat, lon):
+        """(Station, Distanz in km) oder (None, inf)."""
+        best = None
+        best_dist = float("inf")
+        if not self._cells:
+            return best, best_dist
+
+        ci, cj = math.floor(lat), math.floor(lon)
+        imin, imax, jmin, jmax = self._extent
+        max_ring = max(ci - imin, imax - ci, cj - jmin, jmax - cj, 0)
+
+        for r in range(max_ring + 1):
+            for i in range(ci - r, ci + r + 1):
+                # Nur der Rand des Rings; das Innere wurde schon geprüft
+                step = 1 if i in (ci - r, ci + r) else 2 * r or 1
+                for j in range(cj - r, cj + r + 1, step):
+                    for station in self._cells.get((i, j), ()):
+                        dist = _haversine(lat, lon, station["lat"], station["lon"])
+                        if dist < best_dist:
+                            best_dist = dist
+                            best = station
+            # Alle noch nicht geprüften Zellen liegen mindestens r Grad entfernt
+            km_pro_grad = _KM_PRO_GRAD * math.cos(math.radians(min(89.0, abs(lat) + r + 1)))
+            if best is not None and best_dist <= r * km_pro_grad:
+                break
+
+        return best, best_dist
+
+
 class GeoMapper:
-    def __init__(self):
-        self._plz_coords = None
-        self._stations = None
+    def __init__(self, laender=None):
+        self.laender = laender or LAENDER
+        self._plz_coords = {}
+        self._stations = {}
+        self._index = {}
+
+    def _land(self, land):
+        config = self.laender.get(land)
+        if config is None:
+            raise ValueError("Unbekanntes Land: {}".format(land))
+        return config
+
+    def plz_coords_fuer(self, land):
+        """PLZ-Koordinaten eines Landes (lazy, {} wenn nicht vorhanden)."""
+        if land not in self._plz_coords:
+            self._plz_coords[land] = _load_json(self._land(land)["plz_datei"]) or {}
+        return self._plz_coords[land]
+
+    def stations_fuer(self, land):
+        """Stationsliste eines Landes (lazy, [] wenn nicht vorhanden)."""
+        if land not in self._stations:
+            self._stations[land] = _load_json(self._land(land)["stationen_datei"]) or []
+        return self._stations[land]
+
+    def _station_index(self, land):
+        if land not in self._index:
+            self._index[land] = StationIndex(self.stations_fuer(land))
+        return self._index[land]
 
     @property
     def plz_coords(self):
-        if self._plz_coords is None:
-            path = os.path.join(DATA_DIR, "plz_coordinates.json")
-            with open(path, "r") as f:
-                self._plz_coords = json.load(f)
-        return self._plz_coords
+        return self.plz_coords_fuer("DE")
 
     @property
     def stations(self):
-        if self._stations is None:
-            path = os.path.join(DATA_DIR, "dwd_stations.json")
-            with open(path, "r") as f:
-                self._stations = json.load(f)
-        return self._stations
-
-    def get_plz_coordinates(self, plz: str) -> tuple:
+        return self.stations_fuer("DE")
+
+    def datensatz_vorhanden(self, land):
+        """
+        True, wenn PLZ- und Stations-Partition des Landes installiert sind.
+
+        Ohne eigene Stationen wuerden alle PLZ still auf die naechste Station
+        eines Nachbarlandes fallen (oft fast 200 km entfernt).
+        """
+        config = self._land(land)
+        return all(
+            os.path.exists(os.path.join(DATA_DIR, config[datei]))
+            for datei in ("plz_datei", "stationen_datei")
+        )
+
+    def verfuegbare_laender(self):
+        """Länder, für die PLZ- und Stationsdaten vorliegen (prüft nur die Dateien)."""
+        return [land for land in self.laender if self.datensatz_vorhanden(land)]
+
+    def normalize_plz(self, plz: str, land: str = "DE") -> str:
+        """PLZ auf die Stellenzahl des Landes auffüllen."""
+        return str(plz).strip().zfill(self._land(land)["plz_stellen"])
+
+    def get_plz_coordinates(self, plz: str, land: str = "DE") -> tuple:
         """Koordinaten für eine PLZ zurückgeben."""
-        plz = plz.strip().zfill(5)
-        coords = self.plz_coords.get(plz)
+        plz = self.normalize_plz(plz, land)
+        coords = self.plz_coords_fuer(land).get(plz)
         if coords:
             return tuple(coords)
         return None
 
-    def find_nearest_station(self, plz: str) -> dict:
-        """Nächste DWD-Wetterstation für eine PLZ finden."""
-        coords = self.get_plz_coordinates(plz)
+    def find_nearest_station(self, plz: str, land: str = "DE") -> dict:
+        """Nächste Wetterstation für eine PLZ finden."""
+        coords = self.get_plz_coordinates(plz, land)
         if coords is None:
             return None
 
@@ -64,8 +185,8 @@ class GeoMapper:
         best = None
         best_dist = float("inf")
 
-        for station in self.stations:
-            dist = _haversine(lat, lon, station["lat"], station["lon"])
+        for partition in (land,) + tuple(self._land(land)["nachbarn"]):
+            station, dist = self._station_index(partition).nearest(lat, lon)
             if dist < best_dist:
                 best_dist = dist
                 best = station
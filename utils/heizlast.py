@@ -19,6 +19,12 @@ Heizgradtage (HGT):
     HGT = Summe(max(0, T_heizgrenze - T_aussen_tag)) fuer alle Tage
 """
 
+import json
+import os
+from bisect import bisect_right
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
+
 # Typischer Warmwasserverbrauch pro Person und Tag [kWh]
 # ca. 35 Liter/Person/Tag, dT=35K, -> ~1.4 kWh thermisch
 # Mit Verlusten Speicher/Zirkulation: ~3 kWh/Person/Tag (Brennstoffenergie)
@@ -64,19 +70,71 @@ NORM_AUSSENTEMPERATUR = {
     "43": -10,
 }
 
-
-def get_norm_temperature(plz):
-    """Norm-Aussentemperatur fuer eine PLZ ermitteln."""
-    prefix2 = plz[:2]
-    if prefix2 in NORM_AUSSENTEMPERATUR:
-        return NORM_AUSSENTEMPERATUR[prefix2]
-    return -12.0
+# Ersatzwert, wenn weder PLZ- noch Regionstabelle einen Wert haben
+NORM_TEMPERATUR_ERSATZ = -12.0
+
+# Baujahr-Tabelle fuer bisect vorberechnet (Bereiche sind sortiert und disjunkt)
+_BAUJAHR_VON = [von for von, _ in sorted(HEIZLAST_NACH_BAUJAHR)]
+_BAUJAHR_EINTRAEGE = [
+    (bis, werte) for (_, bis), werte in sorted(HEIZLAST_NACH_BAUJAHR.items())
+]
+
+# PLZ-genaue Abweichungen von NORM_AUSSENTEMPERATUR
+# (data/plz_norm_temperatures.json, erzeugt mit scripts/build_norm_temperatures.py
+# aus der amtlichen PLZ-Liste; leer, solange diese nicht importiert ist; andere
+# Laender unter data/<land>/plz_norm_temperatures.json), lazy je Land geladen
+_plz_norm_temperaturen = {}
+
+
+def _get_plz_norm_temperaturen(land="DE"):
+    if land not in _plz_norm_temperaturen:
+        if land == "DE":
+            path = os.path.join(DATA_DIR, "plz_norm_temperatures.json")
+        else:
+            path = os.path.join(DATA_DIR, land.lower(), "plz_norm_temperatures.json")
+        try:
+            with open(path, "r") as f:
+                _plz_norm_temperaturen[land] = json.load(f)
+        except OSError:
+            _plz_norm_temperaturen[land] = {}
+    return _plz_norm_temperaturen[land]
+
+
+def _norm_temperatur_nachschlagen(plz, land="DE"):
+    """Norm-Aussentemperatur aus PLZ- oder Regionstabelle, None wenn keine passt."""
+    t_norm = _get_plz_norm_temperaturen(land).get(plz)
+    if t_norm is not None:
+        return t_norm
+    # Die Regionstabelle gilt nur fuer deutsche PLZ
+    if land == "DE":
+        return NORM_AUSSENTEMPERATUR.get(plz[:2])
+    return None
+
+
+def get_norm_temperature(plz, land="DE"):
+    """Norm-Aussentemperatur fuer eine PLZ ermitteln (PLZ-genau, sonst Region)."""
+    t_norm = _norm_temperatur_nachschlagen(plz, land)
+    return NORM_TEMPERATUR_ERSATZ if t_norm is None else t_norm
+
+
+def norm_temperatur_warnung(plz, land="DE"):
+    """Warnung, wenn fuer die PLZ nur der Ersatzwert vorliegt, sonst None."""
+    if _norm_temperatur_nachschlagen(plz, land) is not None:
+        return None
+    return (
+        "Fuer PLZ {} ({}) ist keine Norm-Aussentemperatur hinterlegt. Es wurde "
+        "{}C angenommen, die Heizlast ist entsprechend unsicher.".format(
+            plz, land, NORM_TEMPERATUR_ERSATZ
+        )
+    )
 
 
 def get_heizlast_schaetzung_baujahr(baujahr, wohnflaeche):
     """Grobe Heizlast-Schaetzung nur aus Baujahr und Wohnflaeche."""
-    for (von, bis), (w_min, w_max) in HEIZLAST_NACH_BAUJAHR.items():
-        if von <= baujahr <= bis:
+    i = bisect_right(_BAUJAHR_VON, baujahr) - 1
+    if i >= 0:
+        bis, (w_min, w_max) = _BAUJAHR_EINTRAEGE[i]
+        if baujahr <= bis:
             return {
                 "min_kw": round(w_min * wohnflaeche / 1000, 2),
                 "max_kw": round(w_max * wohnflaeche / 1000, 2),
@@ -123,6 +181,7 @@ def berechne_heizlast(
     t_heizgrenze=15.0,
     eta=1.0,
     messdauer_tage=None,
+    land="DE",
 ):
     """
     Berechne die Heizlast aus Gasverbrauch und Tagesmitteltemperaturen.
@@ -141,6 +200,7 @@ def berechne_heizlast(
         eta: Anlagen-Jahresnutzungsgrad (1.0 = kWh-Eingabe/Nutzwaerme)
         messdauer_tage: Exakter Messzeitraum in Tagen (Dezimalwert, z.B. 2.0)
                         Wenn None, wird len(daily_temps) als Fallback verwendet.
+        land: Laendercode der PLZ (DE, AT, CH)
     """
     if not daily_temps:
         return {"error": "Keine Temperaturdaten vorhanden."}
@@ -154,7 +214,7 @@ def berechne_heizlast(
     if tage <= 0:
         return {"error": "Messzeitraum darf nicht 0 Tage sein."}
 
-    t_norm = get_norm_temperature(plz)
+    t_norm = get_norm_temperature(plz, land)
 
     # Nutzwaerme aus Brennstoffverbrauch
     q_nutz = gasverbrauch_kwh * eta
@@ -234,6 +294,9 @@ def berechne_heizlast(
 
     # Zeitraum-Warnung
     warnungen = []
+    norm_warnung = norm_temperatur_warnung(plz, land)
+    if norm_warnung:
+        warnungen.append(norm_warnung)
     if tage < 7:
         warnungen.append(
             "Kurzer Messzeitraum ({} Tage). "
@@ -0,0 +1,115 @@
+"""
+Opt-in Profiling einzelner Requests (cProfile, Ausgabe im pstats-Format).
+
+Ausgeloest wird ein Profil durch eine der folgenden Bedingungen:
+    PROFILE_HEADER_TOKEN   Header "X-Profile" enthaelt genau diesen Token
+    PROFILE_SAMPLE_RATE    Anteil zufaellig profilierter Requests (0..1)
+    PROFILE_SLOW_MS        Requests werden profiliert, gespeichert wird nur,
+                           wenn sie laenger als diese Grenze dauern
+    PROFILE_SLOW_RATE      Anteil der Requests, die fuer PROFILE_SLOW_MS
+                           profiliert werden (Default 1 = alle)
+
+Achtung: cProfile verlangsamt Python-lastigen Code deutlich (bei
+/api/berechnen gemessen etwa Faktor 2.5). Mit PROFILE_SLOW_MS allein
+zahlt jeder Request diesen Aufschlag; im Dauerbetrieb daher mit
+PROFILE_SLOW_RATE auf eine Stichprobe (z.B. 0.05) begrenzen.
+
+Pro Prozess laeuft hoechstens ein Profil gleichzeitig (ab Python 3.12 darf
+nur ein Profiler aktiv sein); parallele Requests laufen dann unprofiliert.
+
+Profile landen in PROFILE_DIR (ohne PROFILE_DIR ist alles deaktiviert), es
+werden hoechstens PROFILE_MAX_FILES Dateien behalten. Auswertung z.B. mit
+    python -m pstats <datei>.prof   oder   snakeviz <datei>.prof
+Ist nichts konfiguriert, kostet der Decorator nur einen Bool-Check.
+"""
+
+import cProfile
+import functools
+import glob
+import logging
+import os
+import random
+import threading
+import time
+
+from flask import request
+
+PROFILE_DIR = os.environ.get("PROFILE_DIR", "")
+PROFILE_HEADER_TOKEN = os.environ.get("PROFILE_HEADER_TOKEN", "")
+PROFILE_SAMPLE_RATE = float(os.environ.get("PROFILE_SAMPLE_RATE", "0") or 0)
+PROFILE_SLOW_MS = float(os.environ.get("PROFILE_SLOW_MS", "0") or 0)
+PROFILE_SLOW_RATE = float(os.environ.get("PROFILE_SLOW_RATE", "1") or 1)
+PROFILE_MAX_FILES = int(os.environ.get("PROFILE_MAX_FILES", "50") or 50)
+
+AKTIV = bool(PROFILE_DIR) and bool(
+    PROFILE_HEADER_TOKEN or PROFILE_SAMPLE_RATE > 0 or PROFILE_SLOW_MS > 0
+)
+
+logger = logging.getLogger(__name__)
+
+# Nur ein aktiver Profiler pro Prozess
+_profil_lock = threading.Lock()
+
+
+def _soll_profilieren():
+    """(profilieren, immer_speichern) fuer den aktuellen Request."""
+    if PROFILE_HEADER_TOKEN and request.headers.get("X-Profile") == PROFILE_HEADER_TOKEN:
+        return True, True
+    if PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE:
+        return True, True
+    if PROFILE_SLOW_MS > 0 and (PROFILE_SLOW_RATE >= 1 or random.random() < PROFILE_SLOW_RATE):
+        return True, False
+    return False, False
+
+
+def _speichern(profiler, name, dauer_ms):
+    """Profil als .prof ablegen und alte Dateien ueber dem Limit loeschen."""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    dateiname = "{}_{}_{}ms_{}.prof".format(
+        time.strftime("%Y%m%d-%H%M%S"), name, int(dauer_ms), os.getpid()
+    )
+    profiler.dump_stats(os.path.join(PROFILE_DIR, dateiname))
+
+    dateien = sorted(glob.glob(os.path.join(PROFILE_DIR, "*.prof")), key=os.path.getmtime)
+    for alt in dateien[:-PROFILE_MAX_FILES]:
+        try:
+            os.unlink(alt)
+        except OSError:
+            pass
+
+
+def profiled(view):
+    """Decorator fuer Flask-Views: Profil nach obigen Regeln erfassen."""
+    if not AKTIV:
+        return view
+
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        profilieren, immer_speichern = _soll_profilieren()
+        if not profilieren:
+            return view(*args, **kwargs)
+
+        if not _profil_lock.acquire(blocking=False):
+            return view(*args, **kwargs)
+        try:
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError:
+                # Ein anderer Profiler (z.B. extern gestartet) ist schon aktiv
+                return view(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return view(*args, **kwargs)
+            finally:
+                profiler.disable()
+                dauer_ms = (time.perf_counter() - start) * 1000
+                if immer_speichern or dauer_ms >= PROFILE_SLOW_MS:
+                    try:
+                        _speichern(profiler, view.__name__, dauer_ms)
+                    except OSError:
+                        logger.exception("Profil fuer %s konnte nicht gespeichert werden", view.__name__)
+        finally:
+            _profil_lock.release()
+
+    return wrapper
@@ -0,0 +1,54 @@
+"""
+Aufzeichnen und Abspielen von Bright-Sky-Antworten (Fixture-Store).
+
+Ist BRIGHTSKY_RECORD_DIR gesetzt, legt utils.upstream jede erfolgreiche
+Antwort als gzip-JSON ab, eine Datei pro Anfrage:
+
+    <dir>/<sha1 von Pfad + sortierten Parametern>.json.gz
+
+scripts/brightsky_stub.py spielt diese Dateien wieder ab.
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+from urllib.parse import urlencode
+
+RECORD_DIR = os.environ.get("BRIGHTSKY_RECORD_DIR", "")
+
+
+def fixture_key(path, params):
+    """Deterministischer Schluessel aus Pfad und Parametern."""
+    canonical = path + "?" + urlencode(sorted((k, str(v)) for k, v in params.items()))
+    return hashlib.sha1(canonical.encode("utf-8")).hexdigest()
+
+
+def record(store_dir, path, params, data):
+    """Antwort atomar im Store ablegen (mehrere Worker duerfen parallel schreiben)."""
+    os.makedirs(store_dir, exist_ok=True)
+    target = os.path.join(store_dir, fixture_key(path, params) + ".json.gz")
+    fd, tmp_path = tempfile.mkstemp(dir=store_dir, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            # mtime=0: gleiche Antwort ergibt byte-gleiche Datei
+            with gzip.GzipFile(fileobj=f, mode="wb", mtime=0) as gz:
+                gz.write(json.dumps(
+                    {"path": path, "params": {k: str(v) for k, v in params.items()}, "data": data},
+                    sort_keys=True,
+                ).encode("utf-8"))
+        os.replace(tmp_path, target)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
+
+
+def load(store_dir, path, params):
+    """Aufgezeichnete Antwort oder None."""
+    target = os.path.join(store_dir, fixture_key(path, params) + ".json.gz")
+    try:
+        with gzip.open(target, "rb") as f:
+            return json.loads(f.read().decode("utf-8"))["data"]
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,168 @@
+"""
+Laufende Saison-Auswertung aus regelmaessigen Zaehlerstaenden.
+
+Statt bei jeder neuen Ablesung die ganze Saison neu zu rechnen, wird pro
+Gebaeude ein kompakter Zustand gefuehrt (kumulierte HGT, Verbrauch, Tage
+und Summen fuer die Regression). Eine neue Ablesung braucht nur die
+Tagesmitteltemperaturen seit der letzten Ablesung: O(neue Tage).
+
+Jeder Tag gehoert genau zu einem Intervall [letzte Ablesung, neue Ablesung).
+
+Regression ueber die Intervalle (ohne Achsenabschnitt):
+    Q_i = a * tage_i + b * HGT_i
+"""
+
+from utils.heizlast import WW_KWH_PRO_PERSON_TAG, get_norm_temperature, norm_temperatur_warnung
+
+
+def neuer_zustand(plz, datum, zaehlerstand, wohnflaeche, personen=0,
+                  t_innen=20.0, t_heizgrenze=15.0, eta=1.0, kwh_faktor=1.0, land="DE"):
+    """
+    Zustand mit der ersten Ablesung anlegen.
+
+    datum: Zeitpunkt der Ablesung (YYYY-MM-DDTHH:MM)
+    kwh_faktor: Umrechnung Zaehlereinheit -> kWh (1.0 bei kWh,
+                Brennwert * Zustandszahl bei m3)
+    """
+    return {
+        "plz": plz,
+        "land": land,
+        "wohnflaeche": wohnflaeche,
+        "personen": personen,
+        "t_innen": t_innen,
+        "t_heizgrenze": t_heizgrenze,
+        "eta": eta,
+        "kwh_faktor": kwh_faktor,
+        "datum_start": datum,
+        "letzte_ablesung": datum,
+        "letzter_zaehlerstand": zaehlerstand,
+        "intervalle": 0,
+        # Kumulierte Werte
+        "messdauer_tage": 0.0,
+        "kalendertage": 0,
+        "heiztage": 0,
+        "hgt": 0.0,
+        "q_nutz": 0.0,
+        # Regressionssummen
+        "s_tt": 0.0, "s_th": 0.0, "s_hh": 0.0, "s_tq": 0.0, "s_hq": 0.0,
+    }
+
+
+def zustand_aktualisieren(zustand, datum, zaehlerstand, daily_temps, messdauer_tage):
+    """
+    Neue Ablesung einrechnen.
+
+    daily_temps: Tagesmittel nur fuer die neuen Tage
+                 [letzte Ablesung, neue Ablesung)
+    messdauer_tage: exakte Dauer seit der letzten Ablesung in Tagen
+
+    Gibt einen neuen Zustand zurueck (der alte bleibt unveraendert).
+    """
+    verbrauch = zaehlerstand - zustand["letzter_zaehlerstand"]
+    if verbrauch < 0:
+        raise ValueError("Der Zaehlerstand ist kleiner als bei der letzten Ablesung.")
+    if messdauer_tage <= 0 or not daily_temps:
+        raise ValueError("Keine neuen Tage seit der letzten Ablesung.")
+
+    t_hg = zustand["t_heizgrenze"]
+    hgt_kalender = 0.0
+    heiztage = 0
+    for temp in daily_temps.values():
+        if temp < t_hg:
+            hgt_kalender += t_hg - temp
+            heiztage += 1
+
+    # HGT auf den exakten Messzeitraum normieren (wie berechne_heizlast)
+    hgt = hgt_kalender * messdauer_tage / len(daily_temps)
+    q = verbrauch * zustand["kwh_faktor"] * zustand["eta"]
+    t = messdauer_tage
+
+    neu = dict(zustand)
+    neu.update({
+        "letzte_ablesung": datum,
+        "letzter_zaehlerstand": zaehlerstand,
+        "intervalle": zustand["intervalle"] + 1,
+        "messdauer_tage": zustand["messdauer_tage"] + t,
+        "kalendertage": zustand["kalendertage"] + len(daily_temps),
+        "heiztage": zustand["heiztage"] + heiztage,
+        "hgt": zustand["hgt"] + hgt,
+        "q_nutz": zustand["q_nutz"] + q,
+        "s_tt": zustand["s_tt"] + t * t,
+        "s_th": zustand["s_th"] + t * hgt,
+        "s_hh": zustand["s_hh"] + hgt * hgt,
+        "s_tq": zustand["s_tq"] + t * q,
+        "s_hq": zustand["s_hq"] + hgt * q,
+    })
+    return neu
+
+
+def _regression(zustand):
+    """a, b aus den Intervallsummen, oder None wenn (noch) nicht bestimmbar."""
+    det = zustand["s_tt"] * zustand["s_hh"] - zustand["s_th"] ** 2
+    if zustand["intervalle"] < 2 or det <= 1e-9 * zustand["s_tt"] * zustand["s_hh"]:
+        return None
+    a = (zustand["s_tq"] * zustand["s_hh"] - zustand["s_hq"] * zustand["s_th"]) / det
+    b = (zustand["s_hq"] * zustand["s_tt"] - zustand["s_tq"] * zustand["s_th"]) / det
+    if a < 0 or b <= 0:
+        return None
+    return a, b
+
+
+def auswerten(zustand):
+    """Heizlast aus dem kumulierten Zustand (gleiche Methode wie berechne_heizlast)."""
+    tage = zustand["messdauer_tage"]
+    hgt = zustand["hgt"]
+    q_nutz = zustand["q_nutz"]
+    if tage <= 0:
+        return {"error": "Noch keine Ablesung nach dem Start vorhanden."}
+    if hgt <= 0:
+        return {"error": "Bisher keine Heiztage in der Saison."}
+
+    # Grundlast-Trennung wie in berechne_heizlast
+    kalendertage = zustand["kalendertage"]
+    nicht_heiztage = kalendertage - zustand["heiztage"]
+    if zustand["personen"] > 0:
+        warmwasser_kwh = zustand["personen"] * WW_KWH_PRO_PERSON_TAG * tage
+        grundlast_methode = "personen"
+    elif nicht_heiztage >= 3:
+        warmwasser_kwh = q_nutz * nicht_heiztage / kalendertage
+        grundlast_methode = "automatisch"
+    else:
+        warmwasser_kwh = q_nutz * 0.12
+        grundlast_methode = "pauschal"
+    q_heiz = max(0, q_nutz - warmwasser_kwh)
+
+    b = q_heiz / hgt
+    t_norm = get_norm_temperature(zustand["plz"], zustand.get("land", "DE"))
+    delta_t_norm = zustand["t_innen"] - t_norm
+    heizlast_norm = b * delta_t_norm / 24
+    wohnflaeche = zustand["wohnflaeche"]
+
+    result = {
+        "heizlast_kw": round(heizlast_norm, 2),
+        "heizlast_spezifisch_w_m2": round(heizlast_norm * 1000 / wohnflaeche, 1) if wohnflaeche > 0 else 0,
+        "norm_aussentemperatur": t_norm,
+        "waermeverlustkennwert_b": round(b, 3),
+        "heizgradtage": round(hgt, 1),
+        "heizenergie_kwh": round(q_heiz, 1),
+        "nutzwaerme_kwh": round(q_nutz, 1),
+        "warmwasser_kwh": round(warmwasser_kwh, 1),
+        "grundlast_methode": grundlast_methode,
+        "messdauer_tage": round(tage, 2),
+        "intervalle": zustand["intervalle"],
+        "regression": None,
+        "warnungen": [],
+    }
+    norm_warnung = norm_temperatur_warnung(zustand["plz"], zustand.get("land", "DE"))
+    if norm_warnung:
+        result["warnungen"].append(norm_warnung)
+
+    reg = _regression(zustand)
+    if reg is not None:
+        a_reg, b_reg = reg
+        result["regression"] = {
+            "grundlast_kwh_tag": round(a_reg, 2),
+            "waermeverlustkennwert_b": round(b_reg, 3),
+            "heizlast_kw": round(b_reg * delta_t_norm / 24, 2),
+        }
+    return result
@@ -0,0 +1,333 @@
+"""
+Deklarative Eingabeschemas fuer die API-Endpunkte.
+
+Jedes Feld hat einen Typ-Parser (vorab kompilierte Regexe, keine
+strptime-Versuche), optional Default, Grenzen und erlaubte Werte.
+validieren() sammelt alle Fehler und gibt sie strukturiert zurueck:
+
+    {"error": "<erste Meldung>",
+     "fehler": [{"feld": "baujahr", "code": "ungueltig", "meldung": "..."}]}
+"""
+
+import math
+import re
+from datetime import datetime
+
+from utils.geo import LAENDER
+
+# Bright Sky hat historische Stundenwerte ab 2010
+BRIGHTSKY_ERSTES_JAHR = 2010
+
+# Obergrenze fuer den Waermepumpen-Katalog einer Anfrage
+MAX_GERAETE = 200
+
+_PLZ_RE = re.compile(r"^\d{1,5}$")
+_DATUM_RE = re.compile(r"^\d{4}-\d{2}-\d{2}(T\d{2}:\d{2})?$")
+
+
+class Feldfehler(ValueError):
+    def __init__(self, code, meldung):
+        super().__init__(meldung)
+        self.code = code
+        self.meldung = meldung
+
+
+def _plz(raw):
+    plz = str(raw).strip()
+    if not _PLZ_RE.match(plz):
+        raise Feldfehler("ungueltig", "Bitte eine gueltige PLZ eingeben.")
+    return plz
+
+
+def _datum(raw):
+    """'YYYY-MM-DD' oder 'YYYY-MM-DDTHH:MM' -> datetime."""
+    if not isinstance(raw, str) or not _DATUM_RE.match(raw):
+        raise Feldfehler("format", "Ungueltiges Datumsformat.")
+    try:
+        return datetime.fromisoformat(raw)
+    except ValueError:
+        raise Feldfehler("format", "Ungueltiges Datumsformat.")
+
+
+def _float(raw):
+    if isinstance(raw, bool):
+        raise Feldfehler("typ", "Ungueltige Zahlenwerte.")
+    try:
+        wert = float(raw)
+    except (ValueError, TypeError):
+        raise Feldfehler("typ", "Ungueltige Zahlenwerte.")
+    # "nan"/"inf" wuerden als NaN/Infinity (ungueltiges JSON) in der Antwort landen
+    if not math.isfinite(wert):
+        raise Feldfehler("typ", "Ungueltige Zahlenwerte.")
+    return wert
+
+
+def _int(raw):
+    if isinstance(raw, bool):
+        raise Feldfehler("typ", "Ungueltige Zahlenwerte.")
+    try:
+        return int(raw)
+    except (ValueError, TypeError):
+        raise Feldfehler("typ", "Ungueltige Zahlenwerte.")
+
+
+def _bool(raw):
+    return raw in (True, 1, "1", "true")
+
+
+def _str(raw):
+    return str(raw).strip()
+
+
+def _land(raw):
+    return str(raw).strip().upper()
+
+
+def _liste(raw):
+    """Liste oder kommagetrennter String -> Menge von Strings."""
+    if isinstance(raw, str):
+        raw = raw.split(",")
+    if not isinstance(raw, (list, tuple)):
+        raise Feldfehler("typ", "Erwartet wird eine Liste.")
+    return {str(f).strip() for f in raw if str(f).strip()}
+
+
+def _geraete(raw):
+    """Waermepumpen-Katalog: Liste von {"name", "leistung_kw", "leistung_minus7_kw"}."""
+    if not isinstance(raw, list):
+        raise Feldfehler("typ", "Erwartet wird eine Liste von Geraeten.")
+    # Die Simulation rechnet Geraete x 8760 Stunden, daher begrenzen
+    if len(raw) > MAX_GERAETE:
+        raise Feldfehler("bereich", "Hoechstens {} Geraete pro Anfrage.".format(MAX_GERAETE))
+    geraete = []
+    for g in raw:
+        if not isinstance(g, dict) or "leistung_kw" not in g:
+            raise Feldfehler("ungueltig", "Jedes Geraet braucht 'leistung_kw'.")
+        leistung = _float(g["leistung_kw"])
+        if leistung <= 0:
+            raise Feldfehler("bereich", "'leistung_kw' muss groesser als 0 sein.")
+        eintrag = {"name": g.get("name"), "leistung_kw": leistung}
+        if g.get("leistung_minus7_kw") is not None:
+            eintrag["leistung_minus7_kw"] = _float(g["leistung_minus7_kw"])
+        geraete.append(eintrag)
+    return geraete
+
+
+PARSER = {
+    "plz": _plz,
+    "datum": _datum,
+    "float": _float,
+    "int": _int,
+    "bool": _bool,
+    "str": _str,
+    "land": _land,
+    "liste": _liste,
+    "geraete": _geraete,
+}
+
+
+class Feld:
+    """Ein Eingabefeld. Leere Werte (None, "", 0) ergeben den Default."""
+
+    __slots__ = ("name", "parse", "pflicht", "default", "minimum", "maximum", "auswahl")
+
+    def __init__(self, name, typ, pflicht=False, default=None,
+                 minimum=None, maximum=None, auswahl=None):
+        self.name = name
+        self.parse = PARSER[typ]
+        self.pflicht = pflicht
+        self.default = default
+        self.minimum = minimum
+        self.maximum = maximum
+        self.auswahl = frozenset(auswahl) if auswahl else None
+
+
+class Schema:
+    """
+    Feldliste plus optionale felduebergreifende Pruefungen.
+
+    Jede Pruefung bekommt die bereits gueltigen Werte und gibt eine Liste von
+    Fehlern (_fehler) zurueck.
+    """
+
+    def __init__(self, *felder, pruefungen=()):
+        self.felder = felder
+        self.pruefungen = pruefungen
+
+    def validieren(self, data):
+        """
+        Eingaben pruefen und umwandeln.
+
+        Rückgabe: (werte, None) oder (None, Fehler-Dictionary)
+        """
+        if not isinstance(data, dict):
+            meldung = "Erwartet wird ein JSON-Objekt."
+            return None, {"error": meldung, "fehler": [_fehler(None, "typ", meldung)]}
+
+        werte = {}
+        fehler = []
+        for feld in self.felder:
+            raw = data.get(feld.name)
+            if raw in (None, ""):
+                if feld.pflicht:
+                    fehler.append(_fehler(feld.name, "fehlt", "Feld '{}' fehlt.".format(feld.name)))
+                    continue
+                werte[feld.name] = feld.default
+                continue
+            if not raw and feld.default is not None:
+                werte[feld.name] = feld.default
+                continue
+            try:
+                wert = feld.parse(raw)
+            except Feldfehler as e:
+                fehler.append(_fehler(feld.name, e.code, e.meldung))
+                continue
+            if feld.minimum is not None and wert < feld.minimum:
+                fehler.append(_fehler(
+                    feld.name, "bereich",
+                    "Feld '{}' darf nicht kleiner als {} sein.".format(feld.name, feld.minimum),
+                ))
+                continue
+            if feld.maximum is not None and wert > feld.maximum:
+                fehler.append(_fehler(
+                    feld.name, "bereich",
+                    "Feld '{}' darf nicht groesser als {} sein.".format(feld.name, feld.maximum),
+                ))
+                continue
+            if feld.auswahl is not None and isinstance(wert, set):
+                unbekannt = wert - feld.auswahl
+                if unbekannt:
+                    fehler.append(_fehler(
+                        feld.name, "auswahl",
+                        "Unbekannte Werte in '{}': {}. Erlaubt: {}".format(
+                            feld.name, ", ".join(sorted(unbekannt)), ", ".join(sorted(feld.auswahl))
+                        ),
+                    ))
+                    continue
+            elif feld.auswahl is not None and wert not in feld.auswahl:
+                fehler.append(_fehler(
+                    feld.name, "auswahl",
+                    "Feld '{}' muss einer der Werte {} sein.".format(
+                        feld.name, ", ".join(sorted(feld.auswahl))
+                    ),
+                ))
+                continue
+            werte[feld.name] = wert
+
+        for pruefung in self.pruefungen:
+            fehler.extend(pruefung(werte))
+
+        if fehler:
+            return None, {"error": fehler[0]["meldung"], "fehler": fehler}
+        return werte, None
+
+
+def _fehler(feld, code, meldung):
+    return {"feld": feld, "code": code, "meldung": meldung}
+
+
+def _plz_zum_land(werte):
+    """PLZ darf nicht mehr Stellen haben als im Land ueblich (fuehrende Nullen duerfen fehlen)."""
+    plz = werte.get("plz")
+    land = werte.get("land")
+    if plz is None or land not in LAENDER:
+        return []
+    stellen = LAENDER[land]["plz_stellen"]
+    if len(plz) > stellen:
+        return [_fehler("plz", "ungueltig", "Bitte eine gueltige {}-stellige PLZ eingeben.".format(stellen))]
+    return []
+
+
+# Top-Level-Abschnitte der /api/berechnen-Antwort (berechne_heizlast + app.py)
+ERGEBNIS_ABSCHNITTE = (
+    "heizlast_kw", "heizlast_spezifisch_w_m2", "mittlere_heizleistung_kw",
+    "norm_aussentemperatur", "heizenergie_kwh", "nutzwaerme_kwh", "warmwasser_kwh",
+    "warmwasser_anteil_pct", "grundlast_methode", "waermeverlustkennwert_b",
+    "heizgradtage", "heizgradtage_kalendertage", "heiztage", "nicht_heiztage",
+    "heizgrenze", "t_avg_heiztage", "t_avg_alle", "schaetzung_baujahr",
+    "empfehlung_waermepumpe_kw", "sensitivitaet", "eta", "messdauer_tage",
+    "kalendertage", "warnungen",
+    "station", "temperatur", "eingaben", "daily_temps",
+)
+
+# Formatoptionen der Antwort (auch als Query-Parameter erlaubt)
+ANTWORT_FELDER = (
+    Feld("fields", "liste", auswahl=ERGEBNIS_ABSCHNITTE),
+    Feld("compact", "bool", default=False),
+    Feld("precision", "int", minimum=0, maximum=6),
+)
+
+BERECHNEN = Schema(
+    Feld("plz", "plz", pflicht=True),
+    Feld("land", "land", default="DE", auswahl=LAENDER),
+    Feld("datum_von", "datum", pflicht=True),
+    Feld("datum_bis", "datum", pflicht=True),
+    Feld("gasverbrauch", "float", pflicht=True, minimum=0),
+    Feld("wohnflaeche", "float", pflicht=True, minimum=0),
+    Feld("baujahr", "int", pflicht=True),
+    Feld("personen", "int", default=0, minimum=0),
+    Feld("heizgrenze", "float", default=15.0),
+    Feld("brennwert", "float", default=11.2),
+    Feld("zustandszahl", "float", default=0.95),
+    Feld("eta", "float", default=1.0),
+    Feld("einheit", "str", default="kwh", auswahl=("kwh", "m3")),
+    *ANTWORT_FELDER,
+    pruefungen=(_plz_zum_land,),
+)
+
+SAISON = Schema(
+    Feld("datum", "datum", pflicht=True),
+    Feld("zaehlerstand", "float", pflicht=True, minimum=0),
+    Feld("saison_id", "str"),
+)
+
+SAISON_NEU = Schema(
+    Feld("plz", "plz", pflicht=True),
+    Feld("land", "land", default="DE", auswahl=LAENDER),
+    Feld("wohnflaeche", "float", pflicht=True, minimum=0),
+    Feld("personen", "int", default=0, minimum=0),
+    Feld("heizgrenze", "float", default=15.0),
+    Feld("eta", "float", default=1.0),
+    Feld("brennwert", "float", default=11.2),
+    Feld("zustandszahl", "float", default=0.95),
+    Feld("einheit", "str", default="kwh", auswahl=("kwh", "m3")),
+    pruefungen=(_plz_zum_land,),
+)
+
+# Vom Client mitgeschickter Saison-Zustand (siehe utils.saison.neuer_zustand)
+ZUSTAND = Schema(
+    Feld("plz", "plz", pflicht=True),
+    Feld("land", "land", default="DE", auswahl=LAENDER),
+    Feld("wohnflaeche", "float", pflicht=True, minimum=0),
+    Feld("personen", "int", pflicht=True, minimum=0),
+    Feld("t_innen", "float", pflicht=True),
+    Feld("t_heizgrenze", "float", pflicht=True),
+    Feld("eta", "float", pflicht=True, minimum=0),
+    Feld("kwh_faktor", "float", pflicht=True, minimum=0),
+    Feld("datum_start", "datum", pflicht=True),
+    Feld("letzte_ablesung", "datum", pflicht=True),
+    Feld("letzter_zaehlerstand", "float", pflicht=True, minimum=0),
+    Feld("intervalle", "int", pflicht=True, minimum=0),
+    Feld("messdauer_tage", "float", pflicht=True, minimum=0),
+    Feld("kalendertage", "int", pflicht=True, minimum=0),
+    Feld("heiztage", "int", pflicht=True, minimum=0),
+    Feld("hgt", "float", pflicht=True, minimum=0),
+    Feld("q_nutz", "float", pflicht=True, minimum=0),
+    Feld("s_tt", "float", pflicht=True),
+    Feld("s_th", "float", pflicht=True),
+    Feld("s_hh", "float", pflicht=True),
+    Feld("s_tq", "float", pflicht=True),
+    Feld("s_hq", "float", pflicht=True),
+    pruefungen=(_plz_zum_land,),
+)
+
+WAERMEPUMPE = Schema(
+    Feld("plz", "plz", pflicht=True),
+    Feld("land", "land", default="DE", auswahl=LAENDER),
+    Feld("waermeverlustkennwert_b", "float", pflicht=True),
+    Feld("grundlast_kwh_tag", "float", default=0.0, minimum=0),
+    Feld("heizgrenze", "float", default=15.0),
+    Feld("referenzjahr", "int", minimum=BRIGHTSKY_ERSTES_JAHR),
+    Feld("geraete", "geraete"),
+    pruefungen=(_plz_zum_land,),
+)
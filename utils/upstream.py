@@ -0,0 +1,195 @@
+"""
+Schutz fuer Upstream-Aufrufe (Bright Sky).
+
+Alle Prozess-Threads teilen sich:
+- einen Token-Bucket (max. Anfragen pro Sekunde),
+- ein adaptives Parallelitaetslimit (AIMD: +1/Limit bei Erfolg,
+  Halbierung bei 429 oder zu hoher Latenz),
+- einen Circuit Breaker (nach mehreren Fehlern in Folge werden Aufrufe
+  fuer eine Abkuehlzeit sofort abgelehnt).
+
+Abgelehnte oder fehlgeschlagene Aufrufe loesen UpstreamError aus; der
+Aufrufer kann dann auf veraltete Cache-Daten ausweichen.
+"""
+
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+
+from utils import replay
+
+
+logger = logging.getLogger(__name__)
+
+# Token-Bucket: Anfragen pro Sekunde und Burst-Groesse
+RATE_PRO_SEKUNDE = float(os.environ.get("BRIGHTSKY_RATE", "10"))
+BURST = int(os.environ.get("BRIGHTSKY_BURST", "20"))
+
+# AIMD-Parallelitaet
+PARALLEL_MIN = 1
+PARALLEL_MAX = int(os.environ.get("BRIGHTSKY_PARALLEL_MAX", "16"))
+LATENZ_GRENZE_S = 5.0
+
+# Circuit Breaker: zaehlt 5xx, Timeouts, Verbindungsfehler und diese 4xx
+FEHLER_BIS_OFFEN = 5
+ABKUEHLZEIT_S = 30.0
+BREAKER_4XX = (408, 429)
+
+# Maximale Wartezeit auf Token/Slot, bevor abgelehnt wird [s]
+WARTEZEIT_MAX_S = 10.0
+
+
+class UpstreamError(Exception):
+    """Upstream-Aufruf fehlgeschlagen oder vom Schutzmechanismus abgelehnt."""
+
+    def __init__(self, message, gedrosselt=False):
+        super().__init__(message)
+        self.gedrosselt = gedrosselt
+
+
+class TokenBucket:
+    """Klassischer Token-Bucket, thread-safe."""
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout):
+        """Ein Token nehmen; False, wenn innerhalb von timeout keins frei wird."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._stamp) * self.rate)
+                self._stamp = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+            if now + wait > deadline:
+                return False
+            time.sleep(wait)
+
+
+class AdaptiveLimiter:
+    """Parallelitaetslimit mit AIMD-Anpassung."""
+
+    def __init__(self, minimum, maximum, latency_limit):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.latency_limit = latency_limit
+        self.limit = float(maximum) / 2
+        self._active = 0
+        self._cond = threading.Condition()
+
+    def acquire(self, timeout):
+        with self._cond:
+            ok = self._cond.wait_for(lambda: self._active < int(self.limit), timeout)
+            if ok:
+                self._active += 1
+            return ok
+
+    def release(self, latency, overloaded):
+        with self._cond:
+            self._active -= 1
+            if overloaded or latency > self.latency_limit:
+                self.limit = max(self.minimum, self.limit / 2)
+            else:
+                self.limit = min(self.maximum, self.limit + 1.0 / self.limit)
+            self._cond.notify_all()
+
+
+class CircuitBreaker:
+    """Oeffnet nach `threshold` Fehlern in Folge fuer `cooldown` Sekunden."""
+
+    def __init__(self, threshold, cooldown):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self._failures = 0
+        self._opened_at = None
+        self._probe = False
+        self._lock = threading.Lock()
+
+    def allow(self):
+        with self._lock:
+            if self._opened_at is None:
+                return True
+            if time.monotonic() - self._opened_at < self.cooldown or self._probe:
+                return False
+            # Halb offen: genau ein Probeaufruf
+            self._probe = True
+            return True
+
+    def record(self, success):
+        with self._lock:
+            self._probe = False
+            if success:
+                self._failures = 0
+                self._opened_at = None
+            else:
+                self._failures += 1
+                if self._failures >= self.threshold:
+                    self._opened_at = time.monotonic()
+
+    def release_probe(self):
+        """Probe-Slot zurueckgeben, wenn der Aufruf vor dem Senden abgelehnt wurde."""
+        with self._lock:
+            self._probe = False
+
+
+bucket = TokenBucket(RATE_PRO_SEKUNDE, BURST)
+limiter = AdaptiveLimiter(PARALLEL_MIN, PARALLEL_MAX, LATENZ_GRENZE_S)
+breaker = CircuitBreaker(FEHLER_BIS_OFFEN, ABKUEHLZEIT_S)
+
+
+def guarded_get(url, params, timeout=30):
+    """
+    requests.get hinter Token-Bucket, AIMD-Limit und Circuit Breaker.
+
+    Rueckgabe: geparstes JSON. Fehler: UpstreamError.
+    """
+    if not breaker.allow():
+        raise UpstreamError("Bright Sky voruebergehend nicht erreichbar.", gedrosselt=True)
+    if not bucket.acquire(WARTEZEIT_MAX_S):
+        breaker.release_probe()
+        raise UpstreamError("Zu viele Anfragen an Bright Sky.", gedrosselt=True)
+    if not limiter.acquire(WARTEZEIT_MAX_S):
+        breaker.release_probe()
+        raise UpstreamError("Zu viele parallele Anfragen an Bright Sky.", gedrosselt=True)
+
+    start = time.monotonic()
+    overloaded = False
+    # True: Erfolg, False: Upstream-Fehler, None: Client-Fehler (zaehlt nicht)
+    success = False
+    try:
+        resp = requests.get(url, params=params, timeout=timeout)
+        overloaded = resp.status_code in (429, 503)
+        if 400 <= resp.status_code < 500 and resp.status_code not in BREAKER_4XX:
+            # z.B. 404 "keine Quellen": Upstream ist gesund, die Anfrage passt nicht
+            success = None
+        resp.raise_for_status()
+        data = resp.json()
+        success = True
+    except (requests.RequestException, ValueError) as e:
+        raise UpstreamError(str(e), gedrosselt=overloaded) from e
+    finally:
+        limiter.release(time.monotonic() - start, overloaded)
+        if success is None:
+            breaker.release_probe()
+        else:
+            breaker.record(success)
+
+    if replay.RECORD_DIR:
+        # Eine fehlgeschlagene Aufzeichnung darf den Request nicht abbrechen
+        try:
+            replay.record(replay.RECORD_DIR, urlparse(url).path, params, data)
+        except OSError:
+            logger.exception("Bright-Sky-Antwort konnte nicht aufgezeichnet werden")
+    return data
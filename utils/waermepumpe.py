@@ -0,0 +1,132 @@
+"""
+Waermepumpen-Auslegung per Stundensimulation ueber ein Referenzjahr.
+
+Modell (konsistent mit berechne_heizlast):
+    Heizbedarf_h = b * (T_innen - T_h) / 24   fuer T_h < T_heizgrenze, sonst 0
+                 + a / 24                     (Grundlast/Warmwasser, optional)
+
+    Leistung der WP bei T_h (linear um den Normpunkt A2/W35):
+    P_wp(T_h) = P_A2 + (P_A2 - P_A-7) / 9 * (T_h - 2)
+
+Alle Geraete werden gemeinsam als Matrix (Geraete x Stunden) gerechnet.
+"""
+
+import numpy as np
+
+# Typische Leistungsabnahme Luft/Wasser-WP ohne Herstellerangabe: ~2.5 %/K
+STANDARD_STEIGUNG_PRO_K = 0.025
+
+# Standardkatalog, wenn keine Geraete angegeben werden [kW bei A2/W35]
+STANDARD_GROESSEN_KW = [3, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 18, 20]
+
+# Stuetzstellen der zurueckgegebenen Jahresdauerlinie
+DAUERLINIE_PUNKTE = 100
+
+
+def stundenprofil(hourly):
+    """
+    {Datum: [Stundenwerte]} zu einem Array mit 24 Werten pro Tag.
+    Tage mit fehlenden Stunden werden linear auf 24 Werte interpoliert.
+    """
+    tage = []
+    ziel = np.linspace(0.0, 1.0, 24)
+    for temps in hourly.values():
+        werte = np.asarray(temps, dtype=float)
+        if len(werte) == 24:
+            tage.append(werte)
+        elif len(werte) == 1:
+            tage.append(np.full(24, werte[0]))
+        elif len(werte) > 1:
+            tage.append(np.interp(ziel, np.linspace(0.0, 1.0, len(werte)), werte))
+    return np.concatenate(tage) if tage else np.empty(0)
+
+
+def _geraete_arrays(geraete):
+    """Katalog in Arrays (Leistung bei A2, Steigung kW/K) umwandeln."""
+    namen, p_a2, steigung = [], [], []
+    for g in geraete:
+        p = float(g["leistung_kw"])
+        p_m7 = g.get("leistung_minus7_kw")
+        namen.append(g.get("name") or "{:g} kW".format(p))
+        p_a2.append(p)
+        steigung.append((p - float(p_m7)) / 9.0 if p_m7 is not None else p * STANDARD_STEIGUNG_PRO_K)
+    return namen, np.array(p_a2), np.array(steigung)
+
+
+def simuliere_waermepumpen(temps, b, t_norm, a=0.0, t_innen=20.0, t_heizgrenze=15.0, geraete=None):
+    """
+    Stundensimulation fuer einen Geraetekatalog.
+
+    Parameter:
+        temps: Array der Stundentemperaturen (Referenzjahr)
+        b: Waermeverlustkennwert [kWh/(Tag*K)]
+        t_norm: Norm-Aussentemperatur [C]
+        a: Grundlast [kWh/Tag] (0 = nur Raumheizung)
+        geraete: Liste von {"name", "leistung_kw", "leistung_minus7_kw"(opt.)}
+    """
+    temps = np.asarray(temps, dtype=float)
+    if temps.size == 0:
+        return {"error": "Kein Stundenprofil vorhanden."}
+    if b <= 0:
+        return {"error": "Der Waermeverlustkennwert muss groesser als 0 sein."}
+    if geraete is None:
+        geraete = [{"leistung_kw": p} for p in STANDARD_GROESSEN_KW]
+    if not geraete:
+        return {"error": "Keine Geraete angegeben."}
+
+    # Stuendlicher Bedarf [kW]
+    heizbedarf = np.where(temps < t_heizgrenze, b * (t_innen - temps) / 24.0, 0.0)
+    bedarf = heizbedarf + a / 24.0
+    jahresbedarf = float(bedarf.sum())
+
+    # Jahresdauerlinie (absteigend sortiert, auf feste Stuetzstellen reduziert)
+    dauerlinie = np.sort(bedarf)[::-1]
+    idx = np.linspace(0, len(dauerlinie) - 1, DAUERLINIE_PUNKTE).round().astype(int)
+
+    namen, p_a2, steigung = _geraete_arrays(geraete)
+
+    # Leistung je Geraet und Stunde (Geraete x Stunden)
+    leistung = np.maximum(p_a2[:, None] + steigung[:, None] * (temps[None, :] - 2.0), 0.0)
+    gedeckt = np.minimum(bedarf[None, :], leistung)
+    waerme_wp = gedeckt.sum(axis=1)
+    # Stundendeckung nur ueber Stunden mit Bedarf (sonst zaehlt jeder Sommertag)
+    heizstunden = bedarf > 0
+    anzahl_heizstunden = int(heizstunden.sum())
+    stunden_gedeckt = ((leistung >= bedarf[None, :]) & heizstunden[None, :]).sum(axis=1)
+
+    # Bivalenzpunkt: Schnitt Heizgerade b*(t_innen-T)/24 + a/24 mit Leistungsgerade
+    # p_a2 + s*(T-2) = (b*t_innen + a)/24 - b/24*T
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t_biv = ((b * t_innen + a) / 24.0 - p_a2 + 2.0 * steigung) / (steigung + b / 24.0)
+    heizlast_norm = b * (t_innen - t_norm) / 24.0 + a / 24.0
+
+    ergebnisse = []
+    for i, name in enumerate(namen):
+        biv = float(t_biv[i])
+        if np.isfinite(biv) and biv >= t_heizgrenze:
+            # Geraet deckt schon an der Heizgrenze nicht: Zusatzheizung ab Heizbeginn
+            biv = t_heizgrenze
+        ergebnisse.append({
+            "name": name,
+            "leistung_kw": round(float(p_a2[i]), 2),
+            "leistung_norm_kw": round(float(max(0.0, p_a2[i] + steigung[i] * (t_norm - 2.0))), 2),
+            "bivalenzpunkt_c": round(biv, 1) if np.isfinite(biv) else None,
+            "deckungsgrad_energie_pct": round(float(waerme_wp[i]) / jahresbedarf * 100, 1) if jahresbedarf > 0 else 100.0,
+            "deckungsgrad_stunden_pct": (
+                round(float(stunden_gedeckt[i]) / anzahl_heizstunden * 100, 1)
+                if anzahl_heizstunden else 100.0
+            ),
+            "vollbenutzungsstunden": int(round(float(waerme_wp[i] / p_a2[i]))) if p_a2[i] > 0 else 0,
+            "heizstab_kwh": round(jahresbedarf - float(waerme_wp[i]), 1),
+        })
+
+    return {
+        "heizlast_norm_kw": round(heizlast_norm, 2),
+        "spitzenlast_kw": round(float(dauerlinie[0]), 2),
+        "jahresbedarf_kwh": round(jahresbedarf, 1),
+        "stunden": int(temps.size),
+        "heizstunden": anzahl_heizstunden,
+        "t_min": round(float(temps.min()), 1),
+        "dauerlinie_kw": [round(float(v), 2) for v in dauerlinie[idx]],
+        "geraete": ergebnisse,
+    }